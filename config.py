@@ -8,7 +8,16 @@ BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"
 OUTPUT_DIR = BASE_DIR / "output"
 CHARACTERS_DIR = DATA_DIR / "characters"
+BOOKS_DIR = DATA_DIR / "books"  # Further plays: data/books/<id>/characters/*.json
+DEFAULT_BOOK = "king_lear"  # Published at the output root (data/characters until migrated)
 GENERATORS_DIR = BASE_DIR / "generators"
+CACHE_DIR = BASE_DIR / ".cache"  # Build reports and caches (not deployed)
+ARTIFACT_CACHE_DIR = CACHE_DIR / "artifacts"
+ARTIFACT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DATASET_SNAPSHOT = CACHE_DIR / "dataset"  # Parsed catalogue + enriched characters, a file per entry; None disables
+MINIFY_HTML = False  # "optimize" stage: drop blank lines and trailing spaces in pages
+PRECOMPRESS_HTML = False  # "write" stage: also write journeys/<id>.html.gz in the same pass
+BUILD_SEED = ""  # Quiz shuffling seed; change it (or pass --seed) to rotate answer order
 
 # Character display order (главные → второстепенные → злодеи → слуги)
 CHARACTER_ORDER = [
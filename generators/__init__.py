@@ -1,7 +1,24 @@
-"""Generators package."""
+"""Generators package.
 
-from .css_lira import LiraCSSGenerator
-from .html_lira import LiraHTMLGenerator
-from .index_gen import IndexGenerator
+The generators are imported on first access, so a tool that needs one of
+them does not load Jinja or the CSS/JS packages used by the others.
+"""
+from typing import TYPE_CHECKING
+
+from utils.lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .css_lira import LiraCSSGenerator
+    from .html_lira import LiraHTMLGenerator
+    from .index_gen import IndexGenerator
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        ".css_lira": ("LiraCSSGenerator",),
+        ".html_lira": ("LiraHTMLGenerator",),
+        ".index_gen": ("IndexGenerator",),
+    },
+)
 
 __all__ = ["LiraCSSGenerator", "LiraHTMLGenerator", "IndexGenerator"]
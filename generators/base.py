@@ -1,14 +1,17 @@
 """Base generator class"""
-from pathlib import Path
 import json
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+from utils.file_operations import STREAM_BUFFER_SIZE, write_if_changed, write_stream_if_changed
+
 class BaseGenerator:
     """Base class for all generators"""
     
     def __init__(self, config):
         self.config = config
+        # Destination of progress/debug lines; the build silences it with --ci
+        self.printer = print
         self.templates_dir = self.config.BASE_DIR / "templates"
         self.static_dir = self.config.BASE_DIR / "static"
         self._env = Environment(
@@ -22,14 +25,44 @@ class BaseGenerator:
             return json.load(f)
     
     def save_file(self, content, filepath):
-        """Save content to file"""
-        filepath = Path(filepath)
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
-        return filepath
+        """Save content to file (temp file + rename, never a partial page)
+
+        Identical content is not rewritten; returns True when the file changed.
+        """
+        return write_if_changed(filepath, content)
+
+    def save_stream(self, chunks, filepath, gzip_path=None):
+        """Stream chunks to a file (temp file + rename), optionally with a .gz copy
+
+        Returns (changed, size in bytes), see write_stream_if_changed.
+        """
+        return write_stream_if_changed(filepath, chunks, gzip_path=gzip_path)
 
     def render_template(self, template_name, **context):
         """Render template using the configured environment"""
         template = self._env.get_template(template_name)
         return template.render(**context)
+
+    def stream_template(self, template_name, **context):
+        """Render template as a stream of text chunks of about STREAM_BUFFER_SIZE characters
+
+        Jinja yields every literal and expression separately; they are
+        joined into larger chunks so later stages see a few dozen per page.
+        """
+        template = self._env.get_template(template_name)
+        buffer, buffered = [], 0
+        for part in template.generate(**context):
+            if len(part) >= STREAM_BUFFER_SIZE:
+                # A large value (e.g. an inline script) is passed on without a copy
+                if buffer:
+                    yield "".join(buffer)
+                    buffer, buffered = [], 0
+                yield part
+                continue
+            buffer.append(part)
+            buffered += len(part)
+            if buffered >= STREAM_BUFFER_SIZE:
+                yield "".join(buffer)
+                buffer, buffered = [], 0
+        if buffer:
+            yield "".join(buffer)
@@ -0,0 +1,72 @@
+"""Build orchestration helpers for the site generator."""
+
+from typing import TYPE_CHECKING
+
+from utils.lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .assets import SyncReport, sync_file, sync_tree
+    from .books import Book, character_ids, discover_books
+    from .daemon import BuildDaemon, send_command
+    from .dependencies import VocabularyDependencies
+    from .errors import ErrorManifest, error_manifest_path
+    from .inputs import BuildInputs
+    from .manifest import MANIFEST_NAME, BuildManifest
+    from .pool import PageResult, PageTask, build_pages
+    from .profile import BuildProfile
+    from .shards import find_shards, parse_shard, shard_dir
+    from .site import BuildOptions, BuildReport, SiteBuilder
+    from .snapshot import DatasetSnapshot, load_dataset
+    from .staging import StagedOutput
+    from .watch import Watcher
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        ".assets": ("SyncReport", "sync_file", "sync_tree"),
+        ".books": ("Book", "character_ids", "discover_books"),
+        ".daemon": ("BuildDaemon", "send_command"),
+        ".dependencies": ("VocabularyDependencies",),
+        ".errors": ("ErrorManifest", "error_manifest_path"),
+        ".inputs": ("BuildInputs",),
+        ".manifest": ("MANIFEST_NAME", "BuildManifest"),
+        ".pool": ("PageResult", "PageTask", "build_pages"),
+        ".profile": ("BuildProfile",),
+        ".shards": ("find_shards", "parse_shard", "shard_dir"),
+        ".site": ("BuildOptions", "BuildReport", "SiteBuilder"),
+        ".snapshot": ("DatasetSnapshot", "load_dataset"),
+        ".staging": ("StagedOutput",),
+        ".watch": ("Watcher",),
+    },
+)
+
+__all__ = [
+    "Book",
+    "BuildOptions",
+    "BuildReport",
+    "DatasetSnapshot",
+    "BuildDaemon",
+    "BuildInputs",
+    "BuildManifest",
+    "BuildProfile",
+    "ErrorManifest",
+    "MANIFEST_NAME",
+    "PageResult",
+    "PageTask",
+    "SiteBuilder",
+    "StagedOutput",
+    "SyncReport",
+    "VocabularyDependencies",
+    "Watcher",
+    "build_pages",
+    "character_ids",
+    "discover_books",
+    "error_manifest_path",
+    "find_shards",
+    "load_dataset",
+    "parse_shard",
+    "send_command",
+    "shard_dir",
+    "sync_file",
+    "sync_tree",
+]
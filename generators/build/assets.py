@@ -0,0 +1,102 @@
+"""Copy static assets by content, touching only files that changed."""
+from __future__ import annotations
+
+import os
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List
+
+from utils.file_operations import _temp_path, file_digest
+
+
+@dataclass
+class SyncReport:
+    """What a sync run did, in files and bytes."""
+
+    copied: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    skipped: int = 0
+    bytes_copied: int = 0
+    bytes_skipped: int = 0
+
+    def merge(self, other: "SyncReport", prefix: str = "") -> None:
+        self.copied.extend(prefix + name for name in other.copied)
+        self.removed.extend(prefix + name for name in other.removed)
+        self.skipped += other.skipped
+        self.bytes_copied += other.bytes_copied
+        self.bytes_skipped += other.bytes_skipped
+
+
+def _same_content(src: Path, dst: Path) -> bool:
+    """Whether ``dst`` is a separate file holding the bytes of ``src``.
+
+    A ``dst`` that is a hardlink of ``src`` (left by older builds) counts as
+    different, so it gets replaced by a copy: an edit to the source must not
+    reach the published tree before a build.
+    """
+    try:
+        src_stat, dst_stat = src.stat(), dst.stat()
+    except FileNotFoundError:
+        return False
+    if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+        return False
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    return file_digest(src) == file_digest(dst)
+
+
+def _place(src: Path, dst: Path) -> None:
+    """Copy ``src`` to a temp name next to ``dst`` and rename it over ``dst``.
+
+    Always a copy, never a hardlink of the source tree; ``dst`` itself may
+    be hardlinked (the staging mirror of the live tree), which is why it is
+    replaced with a rename and never rewritten in place.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _temp_path(dst)
+    try:
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def sync_file(src: Path, dst: Path, report: SyncReport, name: str = "") -> None:
+    """Copy one file unless ``dst`` already holds identical bytes."""
+    src, dst = Path(src), Path(dst)
+    size = src.stat().st_size
+    if _same_content(src, dst):
+        report.skipped += 1
+        report.bytes_skipped += size
+        return
+    _place(src, dst)
+    report.copied.append(name or dst.name)
+    report.bytes_copied += size
+
+
+def sync_tree(src: Path, dst: Path, prune: bool = True, keep: Iterable[str] = ()) -> SyncReport:
+    """Mirror ``src`` into ``dst`` by content and optionally prune extra files.
+
+    ``keep`` lists paths (relative to ``dst``) of files written by the build
+    itself, which pruning must leave alone.
+    """
+    src, dst = Path(src), Path(dst)
+    report = SyncReport()
+    wanted = {Path(path) for path in keep}
+    for path in sorted(src.rglob("*")):
+        if not path.is_file():
+            continue
+        relative = path.relative_to(src)
+        wanted.add(relative)
+        sync_file(path, dst / relative, report, relative.as_posix())
+    if prune and dst.exists():
+        for path in sorted(dst.rglob("*"), reverse=True):
+            relative = path.relative_to(dst)
+            if path.is_file() and relative not in wanted:
+                path.unlink()
+                report.removed.append(relative.as_posix())
+            elif path.is_dir() and not any(path.iterdir()):
+                path.rmdir()
+    return report
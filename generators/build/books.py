@@ -0,0 +1,111 @@
+"""Books (plays) hosted by the site and where each one is published."""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from generators.html import VocabularyProcessor
+
+BOOK_METADATA = "book.json"
+
+
+@dataclass(frozen=True)
+class Book:
+    """One play: its characters, an optional vocabulary overlay and its output prefix.
+
+    Books are independent shards: each has its own manifest next to its
+    pages, while static assets and the shared catalogue exist only once.
+    """
+
+    id: str
+    title: str
+    characters_dir: Path
+    character_order: Tuple[str, ...]
+    # Directory with vocabulary/vocabulary.json layered over the shared catalogue.
+    data_dir: Optional[Path] = None
+    # Location under output/, "" for the default book published at the root.
+    prefix: str = ""
+
+    @property
+    def root(self) -> str:
+        """Relative path from one of the book's journey pages back to output/."""
+        return "../" * (self.prefix.count("/") + 1)
+
+    def output_dir(self, output_root: Path) -> Path:
+        return Path(output_root) / self.prefix if self.prefix else Path(output_root)
+
+    def character_file(self, char_id: str) -> Path:
+        return self.characters_dir / f"{char_id}.json"
+
+    def vocabulary(self, shared: VocabularyProcessor) -> VocabularyProcessor:
+        """Catalogue used by this book's pages."""
+        if self.data_dir is None:
+            return shared
+        return VocabularyProcessor(self.data_dir, base=shared)
+
+    @property
+    def vocabulary_path(self) -> Optional[Path]:
+        if self.data_dir is None:
+            return None
+        return self.data_dir / "vocabulary" / "vocabulary.json"
+
+
+def _has_characters(book_dir: Path) -> bool:
+    characters_dir = book_dir / "characters"
+    return characters_dir.is_dir() and any(characters_dir.glob("*.json"))
+
+
+def _load_book(book_dir: Path, prefix: str, default_order: Sequence[str] = ()) -> Book:
+    meta: Dict[str, Any] = {}
+    meta_path = book_dir / BOOK_METADATA
+    if meta_path.exists():
+        with meta_path.open("r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+    characters_dir = book_dir / "characters"
+    order = meta.get("characters") or list(default_order)
+    if not order:
+        order = sorted(path.stem for path in characters_dir.glob("*.json"))
+    has_vocabulary = (book_dir / "vocabulary" / "vocabulary.json").exists()
+    return Book(
+        id=book_dir.name,
+        title=meta.get("title") or book_dir.name.replace("_", " ").title(),
+        characters_dir=characters_dir,
+        character_order=tuple(order),
+        data_dir=book_dir if has_vocabulary else None,
+        prefix=prefix,
+    )
+
+
+def discover_books(config: Any) -> List[Book]:
+    """The default book first, then every other book under ``config.BOOKS_DIR``.
+
+    The default book keeps the original layout (``data/characters`` and
+    ``CHARACTER_ORDER``) until ``data/books/<DEFAULT_BOOK>/characters``
+    exists; either way its pages stay at the output root.
+    """
+    books_dir = Path(getattr(config, "BOOKS_DIR", Path(config.DATA_DIR) / "books"))
+    default_id = getattr(config, "DEFAULT_BOOK", "king_lear")
+    default_dir = books_dir / default_id
+    if _has_characters(default_dir):
+        books = [_load_book(default_dir, "", config.CHARACTER_ORDER)]
+    else:
+        books = [
+            Book(
+                id=default_id,
+                title=default_id.replace("_", " ").title(),
+                characters_dir=Path(config.CHARACTERS_DIR),
+                character_order=tuple(config.CHARACTER_ORDER),
+            )
+        ]
+    if books_dir.is_dir():
+        for book_dir in sorted(books_dir.iterdir()):
+            if book_dir.name != default_id and _has_characters(book_dir):
+                books.append(_load_book(book_dir, f"books/{book_dir.name}/"))
+    return books
+
+
+def character_ids(books: Sequence[Book]) -> List[str]:
+    """Every character id of the given books, in build order."""
+    return [char_id for book in books for char_id in book.character_order]
@@ -0,0 +1,122 @@
+"""Resident build server that keeps generators warm between rebuilds."""
+from __future__ import annotations
+
+import json
+import socket
+import socketserver
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .books import character_ids, discover_books
+from .site import BuildOptions, SiteBuilder
+
+COMMANDS = "all | character <id>[,<id>...] | index | ping | stop"
+
+
+class BuildDaemon:
+    """Serve rebuild requests on a Unix socket, one JSON line per reply.
+
+    The process keeps the ``SiteBuilder`` (index generator, vocabulary
+    catalogue) and the in-process ``LiraHTMLGenerator`` alive, so a request
+    costs only the pages it rebuilds. Requests are handled one at a time.
+    """
+
+    def __init__(
+        self,
+        config: Any,
+        socket_path: Path,
+        options: BuildOptions,
+        printer: Callable[..., None] = print,
+    ) -> None:
+        self.socket_path = Path(socket_path)
+        # Work stays in this process so the warm generator is reused.
+        self.options = replace(options, jobs=1, verbose=False)
+        self.printer = printer
+        self.config = config
+        self.builder = SiteBuilder(config, printer=printer)
+        self._server = None
+
+    def handle(self, command: str) -> Dict[str, Any]:
+        """Run one textual command and return the reply."""
+        started = time.perf_counter()
+        command = command.strip()
+        verb, _, argument = command.partition(" ")
+        verb = verb.lower()
+        if verb == "ping":
+            return {"status": "ok", "reply": "pong"}
+        if verb == "stop":
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+            return {"status": "ok", "reply": "stopping"}
+        if verb == "all":
+            options = self.options
+        elif verb == "character" and argument.strip():
+            names = [name for name in argument.replace(",", " ").split() if name]
+            known = set(character_ids(discover_books(self.config)))
+            unknown = [name for name in names if name not in known]
+            if unknown:
+                return {"status": "error", "error": f"unknown character(s): {', '.join(unknown)}"}
+            options = replace(self.options, characters=names, assets=False)
+        elif verb == "index":
+            options = replace(self.options, characters=[], assets=False, force=True)
+        else:
+            return {"status": "error", "error": f"unknown command {command!r}; expected {COMMANDS}"}
+        report = self.builder.build(options)
+        summary = report.to_summary()
+        summary["latency"] = round(time.perf_counter() - started, 4)
+        self.printer(
+            f"[OK] {command}: {report.generated} page(s), index {report.index_status}, "
+            f"{summary['latency'] * 1000:.0f}ms"
+        )
+        return summary
+
+    def serve_forever(self) -> None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("Unix domain sockets are not available on this platform")
+        self._remove_stale_socket()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                line = self.rfile.readline().decode("utf-8")
+                try:
+                    reply = daemon.handle(line)
+                except Exception as exc:  # keep serving after a broken request
+                    reply = {"status": "error", "error": str(exc)}
+                self.wfile.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+
+        with socketserver.UnixStreamServer(str(self.socket_path), Handler) as server:
+            self._server = server
+            self.printer(f"[OK] Build daemon listening on {self.socket_path}")
+            try:
+                server.serve_forever()
+            finally:
+                self.socket_path.unlink(missing_ok=True)
+
+    def _remove_stale_socket(self) -> None:
+        if not self.socket_path.exists():
+            return
+        try:
+            send_command(self.socket_path, "ping", timeout=1.0)
+        except OSError:
+            self.socket_path.unlink()
+            return
+        raise OSError(f"a build daemon is already listening on {self.socket_path}")
+
+
+def send_command(socket_path: Path, command: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Send one command to a running daemon and return its JSON reply."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("Unix domain sockets are not available on this platform")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(str(socket_path))
+        client.sendall((command.strip() + "\n").encode("utf-8"))
+        with client.makefile("rb") as reply:
+            line = reply.readline()
+    if not line:
+        raise OSError("build daemon closed the connection without a reply")
+    return json.loads(line.decode("utf-8"))
@@ -0,0 +1,34 @@
+"""Word-level dependency tracking against the shared vocabulary catalogue."""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from generators.html import VocabularyProcessor
+
+
+class VocabularyDependencies:
+    """Decide whether the catalogue entries a page used have changed.
+
+    The catalogue is only parsed when ``vocabulary.json`` differs from the
+    version a page was built against; otherwise the file digest is enough.
+    """
+
+    def __init__(self, processor: VocabularyProcessor, catalogue_digest: str) -> None:
+        self.processor = processor
+        self.catalogue_digest = catalogue_digest
+
+    def unchanged(self, entry: Dict[str, Any]) -> bool:
+        if entry.get("vocabulary") == self.catalogue_digest:
+            return True
+        words = entry.get("words")
+        if words is None:
+            return False
+        try:
+            if any(self.processor.entry_digest(key) != digest for key, digest in words.items()):
+                return False
+        except (OSError, ValueError):
+            # Unreadable catalogue: rebuild, and let the page build report the error
+            return False
+        # Same words, newer catalogue: remember it so the next check is cheap.
+        entry["vocabulary"] = self.catalogue_digest
+        return True
@@ -0,0 +1,72 @@
+"""Persisted record of failed outputs, used by ``--retry-failed``."""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from utils.file_operations import write_json
+
+ERRORS_VERSION = 1
+
+
+def error_manifest_path(config: Any, shard: Optional[Tuple[int, int]] = None) -> Path:
+    """``.cache/build-errors.json``, one file per shard for sharded builds.
+
+    It lives outside the output tree so failures are kept even when a
+    build publishes nothing.
+    """
+    name = f"build-errors-{shard[0]}-of-{shard[1]}.json" if shard else "build-errors.json"
+    return Path(config.CACHE_DIR) / name
+
+
+class ErrorManifest:
+    """Map output keys (``journeys/kent.html``, ``index.html``) to their last failure.
+
+    Each entry keeps the error, the traceback and the digests of the inputs
+    the failing build used, so a retry can tell whether anything changed.
+    """
+
+    def __init__(self, path: Path, entries: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = entries or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "ErrorManifest":
+        try:
+            with Path(path).open("r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != ERRORS_VERSION:
+            return cls(path)
+        return cls(path, data.get("failed") or {})
+
+    def fail(
+        self,
+        key: str,
+        error: str,
+        traceback: str = "",
+        inputs: Optional[Dict[str, str]] = None,
+        **extra: Any,
+    ) -> None:
+        self.entries[key] = {
+            "error": error,
+            "traceback": traceback,
+            "inputs": dict(inputs or {}),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **extra,
+        }
+
+    def succeed(self, key: str) -> None:
+        self.entries.pop(key, None)
+
+    def keep_only(self, keys: Iterable[str]) -> None:
+        """Drop failures of outputs that no longer exist in the roster."""
+        wanted = set(keys)
+        for key in set(self.entries) - wanted:
+            del self.entries[key]
+
+    def save(self) -> Path:
+        return write_json(self.path, {"version": ERRORS_VERSION, "failed": self.entries})
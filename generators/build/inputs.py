@@ -0,0 +1,83 @@
+"""Content digests of everything a generated page depends on."""
+from __future__ import annotations
+
+import hashlib
+import json
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, List
+
+from utils.file_operations import file_digest, files_digest
+
+
+def _tree_files(root: Path, pattern: str = "*") -> List[Path]:
+    if not root.exists():
+        return []
+    return [
+        path
+        for path in root.rglob(pattern)
+        if path.is_file() and "__pycache__" not in path.parts
+    ]
+
+
+class BuildInputs:
+    """Hash generator inputs once per build and hand out per-output digests."""
+
+    def __init__(self, config: Any, seed: str = "") -> None:
+        self.config = config
+        self.base_dir = Path(config.BASE_DIR)
+        # Quiz shuffling seed: changing it must rebuild every page.
+        self.seed = seed
+
+    def _digest(self, path: Path) -> str:
+        return file_digest(path) if path.exists() else ""
+
+    @cached_property
+    def vocabulary(self) -> str:
+        return self._digest(Path(self.config.DATA_DIR) / "vocabulary" / "vocabulary.json")
+
+    def catalogue(self, book: Any) -> str:
+        """Digest of the shared catalogue plus the book's own overlay, if any."""
+        if book.vocabulary_path is None:
+            return self.vocabulary
+        return f"{self.vocabulary}:{self._digest(book.vocabulary_path)}"
+
+    @cached_property
+    def templates(self) -> str:
+        root = self.base_dir / "templates"
+        return files_digest(_tree_files(root), root)
+
+    @cached_property
+    def runtime(self) -> str:
+        return self._digest(self.base_dir / "static" / "js" / "journey_runtime.js")
+
+    @cached_property
+    def source(self) -> str:
+        """Digest of the generator code, so code changes rebuild everything."""
+        files = _tree_files(Path(self.config.GENERATORS_DIR), "*.py")
+        files += _tree_files(self.base_dir / "utils", "*.py")
+        files.append(self.base_dir / "config.py")
+        return files_digest([path for path in files if path.exists()], self.base_dir)
+
+    def page(self, character_file: Path) -> Dict[str, str]:
+        """Inputs of one journey page.
+
+        The vocabulary catalogue is tracked per word instead (see
+        ``VocabularyDependencies``), so it is not part of these digests.
+        """
+        return {
+            "character": self._digest(Path(character_file)),
+            "templates": self.templates,
+            "runtime": self.runtime,
+            "source": self.source,
+            "seed": self.seed,
+        }
+
+    def index(self, cards: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Inputs of index.html: the character cards (grouped by book) plus templates and code."""
+        payload = json.dumps(cards, ensure_ascii=False, sort_keys=True)
+        return {
+            "cards": hashlib.sha256(payload.encode("utf-8")).hexdigest(),
+            "templates": self.templates,
+            "source": self.source,
+        }
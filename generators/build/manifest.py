@@ -0,0 +1,57 @@
+"""Persisted record of build inputs used to skip unchanged outputs."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from utils.file_operations import write_json
+
+MANIFEST_NAME = ".build-manifest.json"
+MANIFEST_VERSION = 1
+
+
+class BuildManifest:
+    """Map output keys to the input digests they were last built from."""
+
+    def __init__(self, path: Path, entries: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = entries or {}
+
+    @classmethod
+    def load(cls, output_dir: Path) -> "BuildManifest":
+        """Read the manifest from ``output_dir``; a missing or broken file means a full build."""
+        path = Path(output_dir) / MANIFEST_NAME
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get("entries") or {})
+
+    def is_fresh(self, key: str, inputs: Dict[str, str], output_path: Optional[Path] = None) -> bool:
+        """True when ``key`` was built from exactly ``inputs`` and its output still exists."""
+        entry = self.entries.get(key)
+        if not entry or entry.get("inputs") != inputs:
+            return False
+        return output_path is None or Path(output_path).exists()
+
+    def record(self, key: str, inputs: Dict[str, str], **extra: Any) -> None:
+        self.entries[key] = {"inputs": dict(inputs), **extra}
+
+    def forget(self, key: str) -> None:
+        self.entries.pop(key, None)
+
+    def invalidate(self, key: str) -> None:
+        """Force a rebuild of ``key`` but keep what else was recorded (e.g. its index card)."""
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry["inputs"] = {}
+
+    def save(self) -> Path:
+        return write_json(
+            self.path,
+            {"version": MANIFEST_VERSION, "entries": self.entries},
+        )
@@ -0,0 +1,226 @@
+"""Build journey pages serially or in a pool of worker processes."""
+from __future__ import annotations
+
+import importlib
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .books import Book
+
+# Warm generators (one per book) kept alive for the lifetime of a process.
+_generators: Dict[str, Any] = {}
+_shared_vocabulary = None
+_config = None
+_settings: Dict[str, Any] = {"verbose": True, "use_cache": True, "seed": None, "snapshot": None}
+# DatasetSnapshot of the current build, loaded on first use.
+_dataset = None
+
+
+@dataclass(frozen=True)
+class PageTask:
+    """One journey page to build."""
+
+    character_file: Path
+    output_path: Path
+    book: Book
+    # Only these phases get fresh quizzes and exercises (None = all).
+    phases: Optional[Set[str]] = None
+
+
+@dataclass
+class PageResult:
+    """Outcome of building a single journey page."""
+
+    name: str
+    output_path: str
+    ok: bool
+    seconds: float = 0.0
+    size: int = 0
+    error: str = ""
+    traceback: str = ""
+    # Digest of every catalogue entry the page used, keyed by catalogue key.
+    vocabulary: Dict[str, str] = field(default_factory=dict)
+    # Seconds spent in each generation stage (load, enrich, render, ...).
+    stages: Dict[str, float] = field(default_factory=dict)
+    # Index card summary, so the index can be rendered without reloading the character.
+    card: Dict[str, Any] = field(default_factory=dict)
+    book: str = ""
+    # False when the page already held these exact bytes and was left untouched.
+    changed: bool = False
+    # Generated files with content-hashed names that the page links.
+    shared_files: List[str] = field(default_factory=list)
+
+
+def _quiet(*_: Any) -> None:
+    pass
+
+
+def _configure(
+    config: Any,
+    verbose: bool,
+    use_cache: bool,
+    seed: Optional[str] = None,
+    snapshot: Optional[Path] = None,
+) -> None:
+    global _config, _shared_vocabulary, _dataset
+    if config is not _config:
+        _generators.clear()
+        _config, _shared_vocabulary = config, None
+    _settings.update(verbose=verbose, use_cache=use_cache, seed=seed, snapshot=snapshot)
+    _dataset = None
+
+
+def _load_dataset() -> Any:
+    global _dataset
+    if _dataset is None and _settings["snapshot"] is not None:
+        from .snapshot import DatasetSnapshot
+
+        _dataset = DatasetSnapshot.load(_settings["snapshot"])
+    return _dataset
+
+
+def _generator_for(book: Book) -> Any:
+    """Warm generator of ``book``; all books share one base vocabulary catalogue."""
+    global _shared_vocabulary
+    generator = _generators.get(book.id)
+    if generator is None:
+        from generators.html import VocabularyProcessor
+        from generators.html_lira import LiraHTMLGenerator
+
+        if _shared_vocabulary is None:
+            _shared_vocabulary = VocabularyProcessor(_config.DATA_DIR)
+        generator = LiraHTMLGenerator(_config, vocabulary=book.vocabulary(_shared_vocabulary), root=book.root)
+        _generators[book.id] = generator
+    generator.printer = print if _settings["verbose"] else _quiet
+    if not _settings["use_cache"]:
+        generator.artifacts = None
+    seed = _settings["seed"]
+    generator.seed = str(getattr(_config, "BUILD_SEED", "")) if seed is None else seed
+    generator.use_dataset(_load_dataset())
+    return generator
+
+
+def _init_worker(
+    config_name: str,
+    verbose: bool = True,
+    use_cache: bool = True,
+    seed: Optional[str] = None,
+    snapshot: Optional[Path] = None,
+) -> None:
+    """Remember the configuration; generators are created on first use per book."""
+    _configure(importlib.import_module(config_name), verbose, use_cache, seed, snapshot)
+
+
+def _build_page(task: PageTask) -> PageResult:
+    from generators.index_gen import IndexGenerator
+
+    started = time.perf_counter()
+    character_file, output_path = task.character_file, task.output_path
+    generator = _generator_for(task.book)
+    timer = generator.timer
+    timer.reset()
+    try:
+        page = generator.build_journey(character_file, task.phases, output_path)
+        return PageResult(
+            name=character_file.stem,
+            output_path=str(output_path),
+            ok=True,
+            seconds=time.perf_counter() - started,
+            size=page.size,
+            vocabulary=generator.vocabulary.entry_digests(page.vocabulary_keys),
+            stages=timer.reset(),
+            card=IndexGenerator.card(character_file.stem, page.character, task.book.prefix),
+            book=task.book.id,
+            changed=page.changed,
+            shared_files=page.shared_files,
+        )
+    except Exception as exc:  # noqa: BLE001 - a failed page must not stop the build
+        return PageResult(
+            name=character_file.stem,
+            output_path=str(output_path),
+            ok=False,
+            seconds=time.perf_counter() - started,
+            error=str(exc),
+            traceback=traceback.format_exc(),
+            stages=timer.reset(),
+            book=task.book.id,
+        )
+
+
+def _failed(task: PageTask, exc: Exception) -> PageResult:
+    return PageResult(
+        name=task.character_file.stem,
+        output_path=str(task.output_path),
+        ok=False,
+        error=f"worker failed: {exc}",
+        traceback=traceback.format_exc(),
+        book=task.book.id,
+    )
+
+
+def build_pages(
+    config: Any,
+    tasks: Iterable[PageTask],
+    jobs: int = 1,
+    on_result: Optional[Callable[[PageResult], None]] = None,
+    verbose: bool = True,
+    use_cache: bool = True,
+    seed: Optional[str] = None,
+    snapshot: Optional[Path] = None,
+) -> List[PageResult]:
+    """Build journey pages and return results in ``tasks`` order.
+
+    ``tasks`` may be a generator: it is consumed lazily and at most two
+    tasks per worker are in flight, so memory does not grow with the number
+    of characters. Pages are written by the worker and only the small
+    ``PageResult`` travels back.
+
+    With ``jobs > 1`` pages of every book are distributed over one process
+    pool whose workers keep a warm ``LiraHTMLGenerator`` per book.
+    ``seed`` overrides ``config.BUILD_SEED`` for quiz shuffling; with
+    ``snapshot`` characters are taken from that ``DatasetSnapshot`` file.
+    """
+    results: Dict[int, PageResult] = {}
+
+    def _collect(position: int, result: PageResult) -> None:
+        results[position] = result
+        if on_result:
+            on_result(result)
+
+    queue = enumerate(tasks)
+    head = list(islice(queue, 2))
+    if jobs <= 1 or len(head) <= 1:
+        _configure(config, verbose, use_cache, seed, snapshot)
+        for position, task in chain(head, queue):
+            _collect(position, _build_page(task))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        queue = chain(head, queue)
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(config.__name__, verbose, use_cache, seed, snapshot)
+        ) as pool:
+            pending: Dict[Future, Tuple[int, PageTask]] = {}
+
+            def _submit(count: int) -> None:
+                for position, task in islice(queue, count):
+                    pending[pool.submit(_build_page, task)] = (position, task)
+
+            _submit(2 * jobs)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    position, task = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as exc:  # worker died (BrokenProcessPool, pickling errors)
+                        result = _failed(task, exc)
+                    _collect(position, result)
+                _submit(len(done))
+
+    return [results[position] for position in sorted(results)]
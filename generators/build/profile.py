@@ -0,0 +1,83 @@
+"""Collect per-stage build timings and report them."""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from utils.file_operations import write_json
+
+from .pool import PageResult
+
+# Stage order used for table columns; unknown stages are appended.
+STAGE_ORDER = [
+    "load",
+    "enrich",
+    "cache",
+    "prepare",
+    "serialize",
+    "render",
+    "postprocess",
+    "optimize",
+    "write",
+]
+
+
+class BuildProfile:
+    """Per-character stage timings plus site-level stages (static, index)."""
+
+    def __init__(self) -> None:
+        self.pages: Dict[str, Dict[str, float]] = {}
+        self.site: Dict[str, float] = {}
+
+    def add_pages(self, results: Iterable[PageResult]) -> None:
+        for result in results:
+            self.pages[result.name] = dict(result.stages)
+
+    def add_site(self, stages: Dict[str, float]) -> None:
+        for name, seconds in stages.items():
+            self.site[name] = self.site.get(name, 0.0) + seconds
+
+    def stage_totals(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for stages in self.pages.values():
+            for name, seconds in stages.items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def _columns(self) -> List[str]:
+        seen = {name for stages in self.pages.values() for name in stages}
+        return [name for name in STAGE_ORDER if name in seen] + sorted(seen - set(STAGE_ORDER))
+
+    def table(self) -> List[str]:
+        """Text table: characters sorted by total time, then stage totals."""
+        columns = self._columns()
+        header = f"{'character':<12}" + "".join(f"{name[:11]:>12}" for name in columns) + f"{'total':>12}"
+        lines = [header, "-" * len(header)]
+        rows = sorted(self.pages.items(), key=lambda item: sum(item[1].values()), reverse=True)
+        for name, stages in rows:
+            cells = "".join(f"{stages.get(column, 0.0) * 1000:>10.1f}ms" for column in columns)
+            lines.append(f"{name:<12}{cells}{sum(stages.values()) * 1000:>10.1f}ms")
+        totals = self.stage_totals()
+        overall = sum(totals.values()) or 1.0
+        lines.append("")
+        lines.append("stage totals (slowest first):")
+        for name, seconds in totals.items():
+            lines.append(f"  {name:<12}{seconds * 1000:>10.1f}ms  {seconds / overall * 100:5.1f}%")
+        for name, seconds in self.site.items():
+            lines.append(f"  site:{name:<7}{seconds * 1000:>10.1f}ms")
+        return lines
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "pages": {
+                name: {**stages, "total": sum(stages.values())}
+                for name, stages in self.pages.items()
+            },
+            "stages": self.stage_totals(),
+            "site": dict(self.site),
+        }
+
+    def save(self, path: Path) -> Path:
+        return write_json(path, self.to_dict())
@@ -0,0 +1,68 @@
+"""Split page generation into shards (``--shard i/n``) and find them for ``--merge``."""
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Any, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_SHARD_DIR_RE = re.compile(r"^(\d+)-of-(\d+)$")
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """``"2/4"`` -> ``(2, 4)``; shards are numbered from 1."""
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", value or "")
+    if not match:
+        raise ValueError(f"invalid shard {value!r}; expected i/n, e.g. 1/4")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"invalid shard {value!r}; i must be between 1 and n")
+    return index, count
+
+
+def shard_items(items: Sequence[T], index: int, count: int) -> List[T]:
+    """Items of shard ``index`` of ``count``: every n-th one in build order.
+
+    Round-robin over the ordered roster keeps shards within one page of
+    each other and gives every run with the same roster the same split.
+    """
+    return list(items[index - 1 :: count])
+
+
+def shard_root(config: Any) -> Path:
+    """Directory holding one output tree per shard (``output.shards`` by default)."""
+    root = getattr(config, "SHARD_DIR", None)
+    if root:
+        return Path(root)
+    output_dir = Path(config.OUTPUT_DIR)
+    return output_dir.with_name(f"{output_dir.name}.shards")
+
+
+def shard_dir(config: Any, index: int, count: int) -> Path:
+    return shard_root(config) / f"{index}-of-{count}"
+
+
+def find_shards(config: Any) -> List[Path]:
+    """Output trees of a complete shard set, in shard order.
+
+    Raises ValueError when shards are missing or come from different splits.
+    """
+    root = shard_root(config)
+    found = {}
+    if root.is_dir():
+        for path in root.iterdir():
+            match = _SHARD_DIR_RE.match(path.name)
+            if match and path.is_dir():
+                found[(int(match.group(1)), int(match.group(2)))] = path
+    if not found:
+        raise ValueError(f"no shard outputs found in {root}")
+    counts = sorted({count for _, count in found})
+    if len(counts) > 1:
+        splits = ", ".join(f"/{n}" for n in counts)
+        raise ValueError(f"shards of different splits ({splits}) in {root}; remove the outdated ones")
+    count = counts[0]
+    missing = [str(index) for index in range(1, count + 1) if (index, count) not in found]
+    if missing:
+        raise ValueError(f"missing shard(s) {', '.join(missing)} of {count} in {root}")
+    return [found[(index, count)] for index in range(1, count + 1)]
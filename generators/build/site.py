@@ -0,0 +1,654 @@
+"""Whole-site build: static assets, journey pages, index and publishing."""
+from __future__ import annotations
+
+import traceback
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from generators.generated_assets import asset_family, journey_assets
+from generators.html import VocabularyProcessor
+from utils.file_operations import write_if_changed
+from utils.memory import peak_rss
+from utils.timing import StageTimer
+
+from .assets import SyncReport, sync_file, sync_tree
+from .books import Book, discover_books
+from .dependencies import VocabularyDependencies
+from .errors import ErrorManifest, error_manifest_path
+from .inputs import BuildInputs
+from .manifest import BuildManifest
+from .pool import PageResult, PageTask, build_pages
+from .shards import find_shards, shard_dir, shard_items
+from .snapshot import DatasetSnapshot
+from .staging import StagedOutput
+
+
+def _quiet(*_: Any) -> None:
+    pass
+
+
+@dataclass
+class BuildOptions:
+    """What to build and how."""
+
+    jobs: int = 1
+    # Rebuild everything in scope instead of trusting the manifest.
+    force: bool = False
+    use_cache: bool = True
+    stage: bool = True
+    verbose: bool = True
+    # Character ids to rebuild unconditionally; None means every stale page.
+    characters: Optional[Sequence[str]] = None
+    # Character id -> phase ids; only those phases get fresh quizzes and exercises.
+    phases: Optional[Dict[str, Set[str]]] = None
+    # Book ids to build; None means every book. Other books keep their pages.
+    books: Optional[Sequence[str]] = None
+    # Quiz shuffling seed; None uses config.BUILD_SEED.
+    seed: Optional[str] = None
+    # (i, n): build only the i-th of n page shards into its own tree (see shards.py).
+    shard: Optional[Tuple[int, int]] = None
+    # Rebuild only the pages recorded as failed in the error manifest (plus the index).
+    retry_failed: bool = False
+    index: bool = True
+    assets: bool = True
+
+
+@dataclass
+class BuildReport:
+    """Outcome of one ``SiteBuilder.build`` call."""
+
+    output_dir: Path
+    books: List[str] = field(default_factory=list)
+    character_files: List[Path] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+    results: List[PageResult] = field(default_factory=list)
+    skipped: int = 0
+    index_status: str = "missing"
+    index_error: str = ""
+    index_traceback: str = ""
+    sync_report: SyncReport = field(default_factory=SyncReport)
+    # Output files written or removed by this build, relative to output/.
+    changed_files: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    # Resident memory high-water marks in bytes (None where the OS cannot tell).
+    peak_rss: Optional[int] = None
+    worker_peak_rss: Optional[int] = None
+    # Why the staged build could not be swapped in ("" when it was, or was not staged).
+    publish_error: str = ""
+
+    @property
+    def generated(self) -> int:
+        return sum(1 for result in self.results if result.ok)
+
+    @property
+    def ready(self) -> int:
+        return self.generated + self.skipped
+
+    @property
+    def failures(self) -> List[PageResult]:
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def exit_code(self) -> int:
+        """0 = everything built, 2 = partial failure, 1 = nothing usable."""
+        if self.publish_error:
+            return 1
+        if self.ready == 0 and self.index_status not in ("built", "skipped"):
+            return 1
+        if self.failures or self.index_status == "failed":
+            return 2
+        return 0
+
+    def to_summary(self) -> Dict[str, Any]:
+        """Machine-readable summary printed by --ci."""
+        built = [result for result in self.results if result.ok]
+        return {
+            "status": {0: "ok", 1: "failed", 2: "partial"}[self.exit_code],
+            "exit_code": self.exit_code,
+            "output": str(self.output_dir),
+            "pages": {
+                "built": [
+                    {
+                        "name": result.name,
+                        "book": result.book,
+                        "seconds": round(result.seconds, 4),
+                        "bytes": result.size,
+                    }
+                    for result in built
+                ],
+                "skipped": self.skipped,
+                "failed": [
+                    {
+                        "name": result.name,
+                        "book": result.book,
+                        "error": result.error,
+                        "traceback": result.traceback,
+                    }
+                    for result in self.failures
+                ],
+                "bytes": sum(result.size for result in built),
+            },
+            "books": list(self.books),
+            "missing_characters": list(self.missing),
+            "index": {"status": self.index_status, "error": self.index_error, "traceback": self.index_traceback},
+            "changed_files": list(self.changed_files),
+            "publish_error": self.publish_error,
+            "static": {
+                "copied": len(self.sync_report.copied),
+                "removed": len(self.sync_report.removed),
+                "skipped": self.sync_report.skipped,
+                "bytes_copied": self.sync_report.bytes_copied,
+                "bytes_skipped": self.sync_report.bytes_skipped,
+            },
+            "timings": {name: round(seconds, 4) for name, seconds in self.timings.items()},
+            "memory": {"peak_rss": self.peak_rss, "worker_peak_rss": self.worker_peak_rss},
+        }
+
+
+class SiteBuilder:
+    """Build the site into ``config.OUTPUT_DIR``.
+
+    Generators are created once and reused by every ``build`` call, so a
+    long-lived process (see ``BuildDaemon``) only pays for the work itself.
+    """
+
+    def __init__(self, config: Any, printer: Callable[..., None] = print) -> None:
+        self.config = config
+        self.printer = printer
+        # Jinja is only loaded once a builder exists, not when importing this module.
+        from generators.index_gen import IndexGenerator
+
+        self.index_gen = IndexGenerator(config)
+        # Shared catalogue; book overlays are layered on top of it.
+        self.vocabulary = VocabularyProcessor(config.DATA_DIR)
+        self._book_vocabularies: Dict[Tuple[str, Optional[Path]], VocabularyProcessor] = {}
+        self.staged = StagedOutput(config.OUTPUT_DIR)
+
+    def book_vocabulary(self, book: Book) -> VocabularyProcessor:
+        key = (book.id, book.data_dir)
+        if key not in self._book_vocabularies:
+            self._book_vocabularies[key] = book.vocabulary(self.vocabulary)
+        return self._book_vocabularies[key]
+
+    def discover(
+        self,
+        books: Sequence[Book],
+        report: BuildReport,
+        say: Callable[..., None],
+    ) -> List[Tuple[Book, Path]]:
+        """Collect character files in each book's order and note missing ones."""
+        pages = []
+        for book in books:
+            if len(books) > 1:
+                say(f"\n[BOOK] {book.title} ({book.id})")
+            for char_name in book.character_order:
+                char_file = book.character_file(char_name)
+                if char_file.exists():
+                    pages.append((book, char_file))
+                    report.character_files.append(char_file)
+                    say(f"[FOUND] {char_name}.json [OK]")
+                else:
+                    report.missing.append(f"{book.id}/{char_name}" if book.prefix else char_name)
+                    say(f"[MISSING] {char_name}.json [X]")
+        if report.missing:
+            say(f"\n[WARNING] Missing {len(report.missing)} character files:")
+            for char in report.missing:
+                say(f"  - {char}.json")
+        return pages
+
+    def build(self, options: BuildOptions) -> BuildReport:
+        try:
+            return self._build(options)
+        finally:
+            # A build that raised leaves its staging tree (and the output lock) behind
+            self.staged.discard()
+
+    def _build(self, options: BuildOptions) -> BuildReport:
+        say = self.printer if options.verbose else _quiet
+        config = self.config
+
+        errors = ErrorManifest.load(error_manifest_path(config, options.shard))
+        retry = None
+        if options.retry_failed:
+            # Everything that succeeded last time stays as published
+            retry = set(errors.entries)
+            options = replace(options, assets=False)
+            say(f"[RETRY] {len(retry - {'index.html'})} failed page(s) recorded in {errors.path}")
+
+        if options.shard:
+            # A shard only writes its pages (and their manifest entries) into
+            # its own tree; --merge publishes them with the index and assets
+            options = replace(options, stage=False, index=False, assets=False)
+            output_dir = shard_dir(config, *options.shard)
+            say(f"[SHARD] {options.shard[0]}/{options.shard[1]} -> {output_dir}")
+        else:
+            # Build into a staging copy of output/ that is swapped in at the end
+            output_dir = self.staged.prepare() if options.stage else config.OUTPUT_DIR
+        books = discover_books(config)
+        for book in books:
+            (book.output_dir(output_dir) / "journeys").mkdir(parents=True, exist_ok=True)
+        report = BuildReport(
+            output_dir=output_dir if options.shard else config.OUTPUT_DIR,
+            books=[book.id for book in books],
+        )
+        site_timer = StageTimer()
+
+        # Every book is a shard with its own manifest; the default book's
+        # manifest sits at the output root and also tracks index.html
+        manifests = {book.id: BuildManifest.load(book.output_dir(output_dir)) for book in books}
+        seed = options.seed if options.seed is not None else str(getattr(config, "BUILD_SEED", ""))
+        inputs = BuildInputs(config, seed)
+        vocabulary_deps = {
+            book.id: VocabularyDependencies(self.book_vocabulary(book), inputs.catalogue(book))
+            for book in books
+        }
+
+        if options.assets:
+            with site_timer.stage("static"):
+                linked = self._linked_files(books, manifests, output_dir)
+                self._sync_assets(output_dir, report.sync_report, linked)
+            self._report_sync(report.sync_report, say)
+        elif not options.shard:
+            # Rebuilt pages must find the stylesheet version they link to
+            with site_timer.stage("static"):
+                self._write_generated(output_dir, report.sync_report)
+
+        pages = self.discover(books, report, say)
+        all_pages = pages
+        if options.shard:
+            pages = shard_items(pages, *options.shard)
+            report.character_files = [char_file for _, char_file in pages]
+        snapshot = getattr(config, "DATASET_SNAPSHOT", None) if options.use_cache else None
+
+        # Stale pages are selected lazily while the pool consumes them, so
+        # only one task per worker (plus a small look-ahead) exists at a time
+        page_inputs: Dict[str, Dict[str, Any]] = {}
+        wanted = None
+        if options.characters is not None or options.phases:
+            wanted = set(options.characters or ()) | set(options.phases or ())
+        selected = set(options.books) if options.books is not None else None
+
+        def refresh_snapshot() -> None:
+            # Warm-start snapshot of the parsed dataset: only edited characters
+            # are parsed here, the workers unpickle the rest
+            with site_timer.stage("snapshot"):
+                dataset = DatasetSnapshot.load(snapshot)
+                parsed = dataset.refresh(pages, self.book_vocabulary, all_pages)
+                dataset.save()
+            if parsed:
+                say(f"[OK] Dataset snapshot: {parsed} character(s) parsed")
+
+        def stale_pages() -> Iterator[PageTask]:
+            fresh_snapshot = not snapshot
+            for book, char_file in pages:
+                manifest = manifests[book.id]
+                output_path = book.output_dir(output_dir) / "journeys" / f"{char_file.stem}.html"
+                key = f"journeys/{output_path.name}"
+                page = output_path.relative_to(output_dir).as_posix()
+                in_scope = (
+                    (selected is None or book.id in selected)
+                    and (wanted is None or char_file.stem in wanted)
+                    and (retry is None or page in retry)
+                )
+                if not in_scope:
+                    if output_path.exists():
+                        # Not requested: the published page stays as it is
+                        report.skipped += 1
+                    continue
+                fingerprint = inputs.page(char_file)
+                if retry is not None:
+                    same = errors.entries[page].get("inputs") == fingerprint
+                    say(f"[RETRY] {page} ({'same inputs as the failed build' if same else 'inputs changed'})")
+                    task = PageTask(char_file, output_path, book)
+                elif wanted is not None:
+                    phases = (options.phases or {}).get(char_file.stem)
+                    task = PageTask(char_file, output_path, book, phases)
+                elif (
+                    not options.force
+                    and manifest.is_fresh(key, fingerprint, output_path)
+                    and vocabulary_deps[book.id].unchanged(manifest.entries[key])
+                ):
+                    report.skipped += 1
+                    continue
+                else:
+                    task = PageTask(char_file, output_path, book)
+                page_inputs[str(output_path)] = fingerprint
+                if not fresh_snapshot:
+                    # Only once a page needs building, before the pool starts
+                    refresh_snapshot()
+                    fresh_snapshot = True
+                yield task
+
+        jobs = max(1, options.jobs)
+        say(f"\n[INFO] Building stale pages with {jobs} job(s)...")
+        books_by_id = {book.id: book for book in books}
+
+        def on_result(result: PageResult) -> None:
+            # Record each page as it lands; nothing but the summary is kept
+            output_path = Path(result.output_path)
+            book = books_by_id[result.book]
+            key = f"journeys/{output_path.name}"
+            page = output_path.relative_to(output_dir).as_posix()
+            fingerprint = page_inputs.pop(result.output_path)
+            if result.ok:
+                errors.succeed(page)
+                verb = "Saved" if result.changed else "Unchanged"
+                say(f"[OK] {verb}: {output_path.name} ({result.seconds:.2f}s)")
+                if result.changed:
+                    report.changed_files.append(output_path.relative_to(output_dir).as_posix())
+                manifests[book.id].record(
+                    key,
+                    fingerprint,
+                    vocabulary=inputs.catalogue(book),
+                    words=result.vocabulary,
+                    card=result.card,
+                    shared_files=result.shared_files,
+                )
+            else:
+                say(f"[ERROR] Failed to generate {result.name}: {result.error}")
+                if output_path.exists():
+                    # The previous page stays published; keep its index card
+                    manifests[book.id].invalidate(key)
+                else:
+                    manifests[book.id].forget(key)
+                errors.fail(
+                    page,
+                    result.error,
+                    result.traceback,
+                    fingerprint,
+                    book=book.id,
+                    character=result.name,
+                )
+
+        # Generate journey pages of every book in one pool
+        with site_timer.stage("pages"):
+            report.results = build_pages(
+                config,
+                stale_pages(),
+                jobs=jobs,
+                on_result=on_result,
+                verbose=options.verbose,
+                use_cache=options.use_cache,
+                seed=seed,
+                snapshot=Path(snapshot) if snapshot else None,
+            )
+        if report.skipped:
+            reason = (
+                "unchanged or not requested"
+                if wanted or selected or retry is not None
+                else "unchanged since the last build"
+            )
+            say(f"\n[SKIP] {report.skipped} page(s) {reason}")
+
+        if options.index:
+            with site_timer.stage("index"):
+                self._build_index(report, books, pages, manifests, inputs, output_dir, options, say)
+            if report.index_status == "failed":
+                errors.fail("index.html", report.index_error, report.index_traceback)
+            else:
+                errors.succeed("index.html")
+
+        # Failures are kept even when nothing gets published
+        roster = {
+            (book.output_dir(output_dir) / "journeys" / f"{char_file.stem}.html").relative_to(output_dir).as_posix()
+            for book, char_file in pages
+        }
+        errors.keep_only(roster | {"index.html"})
+        errors.save()
+        if errors.entries:
+            say(f"\n[INFO] {len(errors.entries)} failure(s) recorded in {errors.path}; rerun with --retry-failed")
+
+        self._publish(report, manifests, options, site_timer, say)
+        report.worker_peak_rss = peak_rss(children=True) if jobs > 1 and len(report.results) > 1 else None
+        return report
+
+    def merge(self, options: BuildOptions) -> BuildReport:
+        """Publish the pages of every shard together with the index and assets.
+
+        Pages and their manifest entries (index cards included) are taken
+        from the shard trees as they are, so no character file is read.
+        Raises ValueError when the shard set is incomplete.
+        """
+        try:
+            return self._merge(options)
+        finally:
+            self.staged.discard()
+
+    def _merge(self, options: BuildOptions) -> BuildReport:
+        say = self.printer if options.verbose else _quiet
+        config = self.config
+        shards = find_shards(config)
+
+        output_dir = self.staged.prepare() if options.stage else config.OUTPUT_DIR
+        books = discover_books(config)
+        report = BuildReport(output_dir=config.OUTPUT_DIR, books=[book.id for book in books])
+        site_timer = StageTimer()
+        manifests = {book.id: BuildManifest.load(book.output_dir(output_dir)) for book in books}
+        seed = options.seed if options.seed is not None else str(getattr(config, "BUILD_SEED", ""))
+        inputs = BuildInputs(config, seed)
+
+        pages = self.discover(books, report, say)
+        with site_timer.stage("merge"):
+            for shard in shards:
+                for book in books:
+                    shard_output = book.output_dir(shard)
+                    for key, entry in sorted(BuildManifest.load(shard_output).entries.items()):
+                        source = shard_output / key
+                        if not key.startswith("journeys/") or not source.exists():
+                            continue
+                        target = book.output_dir(output_dir) / key
+                        synced = SyncReport()
+                        for suffix in ("", ".gz"):
+                            if Path(f"{source}{suffix}").exists():
+                                name = f"{target.relative_to(output_dir).as_posix()}{suffix}"
+                                sync_file(Path(f"{source}{suffix}"), Path(f"{target}{suffix}"), synced, name)
+                        manifests[book.id].entries[key] = entry
+                        report.changed_files.extend(synced.copied)
+                        report.results.append(
+                            PageResult(
+                                name=source.stem,
+                                output_path=str(target),
+                                ok=True,
+                                size=source.stat().st_size,
+                                card=entry.get("card") or {},
+                                book=book.id,
+                                changed=bool(synced.copied),
+                            )
+                        )
+        say(f"\n[MERGE] {len(report.results)} page(s) from {len(shards)} shard(s) in {shards[0].parent}")
+
+        # After the merge, so the manifests name what the merged pages link
+        if options.assets:
+            with site_timer.stage("static"):
+                linked = self._linked_files(books, manifests, output_dir)
+                self._sync_assets(output_dir, report.sync_report, linked)
+            self._report_sync(report.sync_report, say)
+
+        if options.index:
+            with site_timer.stage("index"):
+                self._build_index(
+                    report, books, pages, manifests, inputs, output_dir, options, say, load_missing=False
+                )
+
+        self._publish(report, manifests, options, site_timer, say)
+        return report
+
+    def _publish(
+        self,
+        report: BuildReport,
+        manifests: Dict[str, BuildManifest],
+        options: BuildOptions,
+        site_timer: StageTimer,
+        say: Callable[..., None],
+    ) -> None:
+        """Save the manifests, swap in the staged tree and finish the report."""
+        for manifest in manifests.values():
+            manifest.save()
+        report.changed_files.extend(report.sync_report.copied + report.sync_report.removed)
+        report.changed_files.sort()
+
+        # Publish the staged build in one swap; keep the old tree for --rollback
+        if options.stage:
+            if (report.ready > 0 or report.index_status == "built") and not report.changed_files:
+                # Nothing the site serves changed: keep output.previous as the
+                # rollback point and only carry the manifests over
+                for manifest in manifests.values():
+                    live = self.staged.target / manifest.path.relative_to(self.staged.staging)
+                    write_if_changed(live, manifest.path.read_bytes())
+                self.staged.discard()
+                say("\n[OK] Nothing changed, live output left as it is")
+            elif report.ready > 0 or report.index_status == "built":
+                try:
+                    with site_timer.stage("publish"):
+                        self.staged.commit()
+                    say(f"\n[OK] Published build (previous kept in {self.staged.previous.name}/)")
+                except (OSError, RuntimeError) as e:
+                    report.publish_error = str(e)
+                    say(f"\n[ERROR] Build not published, live output left untouched: {e}")
+            else:
+                self.staged.discard()
+                say("\n[ERROR] Nothing built, live output left untouched")
+
+        report.timings = site_timer.reset()
+        report.peak_rss = peak_rss()
+
+    @staticmethod
+    def _linked_files(
+        books: Sequence[Book], manifests: Dict[str, BuildManifest], output_dir: Path
+    ) -> Optional[Set[str]]:
+        """Generated files linked by the published pages, from their manifest entries.
+
+        None when a page on disk has no record of them (built before they
+        were recorded, or without a manifest entry).
+        """
+        linked: Set[str] = set()
+        for book in books:
+            entries = manifests[book.id].entries
+            for page in (book.output_dir(output_dir) / "journeys").glob("*.html"):
+                entry = entries.get(f"journeys/{page.name}")
+                if entry is None or "shared_files" not in entry:
+                    return None
+                linked.update(entry["shared_files"])
+        return linked
+
+    def _sync_assets(
+        self, output_dir: Path, sync_report: SyncReport, linked: Optional[Set[str]] = None
+    ) -> None:
+        """Sync static assets for browser caching (only changed files are copied).
+
+        Older versions of the generated files survive pruning while a page
+        in ``linked`` still links them; pages left out of a partial build
+        keep working. With ``linked`` None every older version is kept.
+        """
+        static_src = self.config.BASE_DIR / "static"
+        training_src = self.config.BASE_DIR / "templates" / "training.html"
+        generated = self._write_generated(output_dir, sync_report)
+        keep = set(generated) | (linked or set())
+        if linked is None:
+            families = {asset_family(path) for path in generated}
+            for path in (output_dir / "static").rglob("*"):
+                name = path.relative_to(output_dir).as_posix()
+                if asset_family(name) != name and asset_family(name) in families:
+                    keep.add(name)
+        if static_src.exists():
+            static_keep = [path[len("static/") :] for path in keep if path.startswith("static/")]
+            sync_report.merge(sync_tree(static_src, output_dir / "static", keep=static_keep), prefix="static/")
+        # Copy training.html from templates to output
+        if training_src.exists():
+            sync_file(training_src, output_dir / "training.html", sync_report)
+
+    def _write_generated(self, output_dir: Path, sync_report: SyncReport) -> List[str]:
+        """Write the files generated for every page (content-hashed names); return their paths."""
+        paths = []
+        for asset in journey_assets(self.config).values():
+            data = asset.content.encode("utf-8")
+            if write_if_changed(output_dir / asset.path, data):
+                sync_report.copied.append(asset.path)
+                sync_report.bytes_copied += len(data)
+            else:
+                sync_report.skipped += 1
+                sync_report.bytes_skipped += len(data)
+            paths.append(asset.path)
+        return paths
+
+    @staticmethod
+    def _report_sync(sync_report: SyncReport, say: Callable[..., None]) -> None:
+        say(
+            f"[OK] Static assets: {len(sync_report.copied)} copied "
+            f"({sync_report.bytes_copied / 1024:.1f} KB), "
+            f"{sync_report.skipped} unchanged ({sync_report.bytes_skipped / 1024:.1f} KB), "
+            f"{len(sync_report.removed)} removed"
+        )
+        for name in sync_report.copied:
+            say(f"  + {name}")
+        for name in sync_report.removed:
+            say(f"  - {name}")
+
+    def _build_index(
+        self,
+        report: BuildReport,
+        books: Sequence[Book],
+        pages: Sequence[Tuple[Book, Path]],
+        manifests: Dict[str, BuildManifest],
+        inputs: BuildInputs,
+        output_dir: Path,
+        options: BuildOptions,
+        say: Callable[..., None],
+        load_missing: bool = True,
+    ) -> None:
+        if not pages:
+            return
+        site_manifest = manifests[books[0].id]  # the default book, published at the root
+        sections = self._index_sections(books, pages, manifests, load_missing, say)
+        cards = [card for section in sections for card in section["cards"]]
+        index_inputs = inputs.index(sections)
+        index_path = output_dir / "index.html"
+        if not options.force and site_manifest.is_fresh("index.html", index_inputs, index_path):
+            report.index_status = "skipped"
+            say("\n[SKIP] Index page unchanged")
+            return
+        say("\n[GENERATING] Index page...")
+        try:
+            self.index_gen.printer = self.printer if options.verbose else _quiet
+            index_html = self.index_gen.render(cards, books=sections)
+            if self.index_gen.save_file(index_html, index_path):
+                report.changed_files.append("index.html")
+            site_manifest.record("index.html", index_inputs)
+            report.index_status = "built"
+            say("[OK] Index page created")
+        except Exception as e:
+            site_manifest.forget("index.html")
+            report.index_status, report.index_error = "failed", str(e)
+            report.index_traceback = traceback.format_exc()
+            say(f"[ERROR] Failed to generate index: {e}")
+
+    def _index_sections(
+        self,
+        books: Sequence[Book],
+        pages: Sequence[Tuple[Book, Path]],
+        manifests: Dict[str, BuildManifest],
+        load_missing: bool = True,
+        say: Callable[..., None] = _quiet,
+    ) -> List[Dict[str, Any]]:
+        """Index cards merged from every book's manifest, grouped by book.
+
+        Only pages without a recorded card (never built) are loaded; with
+        ``load_missing`` off they are left out of the index instead.
+        """
+        sections = {book.id: {"id": book.id, "title": book.title, "cards": []} for book in books}
+        for book, char_file in pages:
+            entry = manifests[book.id].entries.get(f"journeys/{char_file.stem}.html", {})
+            card = entry.get("card")
+            if not card and not load_missing:
+                say(f"[WARNING] No index card for {char_file.stem}; not in any shard")
+                continue
+            if not card:
+                try:
+                    character = self.index_gen.load_character(char_file)
+                except (OSError, ValueError) as e:
+                    say(f"[WARNING] {char_file.name} left out of the index: {e}")
+                    continue
+                card = self.index_gen.card(char_file.stem, character, book.prefix)
+            sections[book.id]["cards"].append(card)
+        return [section for section in sections.values() if section["cards"]]
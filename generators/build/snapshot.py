@@ -0,0 +1,212 @@
+"""Warm-start snapshot of the parsed dataset (catalogues and enriched characters)."""
+from __future__ import annotations
+
+import hashlib
+import json
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from generators.html import VocabularyProcessor, vocabulary_processor
+from utils.file_operations import file_digest, write_if_changed
+
+from .books import Book, discover_books
+
+# Bump when the pickled layout changes; enrichment code changes are
+# detected from the source of vocabulary_processor.
+SNAPSHOT_VERSION = 2
+
+INDEX_NAME = "index.pickle"
+
+
+def _version() -> str:
+    return f"{SNAPSHOT_VERSION}:{file_digest(Path(vocabulary_processor.__file__))}"
+
+
+def _key(path: Path) -> str:
+    return Path(path).resolve().as_posix()
+
+
+def _entry_name(key: str, digest: str) -> str:
+    """File of one entry: named by its input, so equal inputs share a file."""
+    return hashlib.sha256(f"{key}\0{digest}".encode("utf-8")).hexdigest()[:32] + ".pickle"
+
+
+class DatasetSnapshot:
+    """Parsed catalogues and enriched characters, one pickle file per entry.
+
+    ``path`` is a directory: ``index.pickle`` maps every input file to the
+    SHA-256 it was parsed from and the entry file holding the result, and
+    ``entries/`` holds those files. Loading a snapshot reads only the index;
+    a character is unpickled when asked for, so a process holds just the
+    characters it renders, however large the roster. Each call returns a
+    fresh copy that the caller may mutate.
+
+    An entry is only handed out while its input files still match; the
+    caller parses again and ``put_*`` replaces the entry.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        # catalogue path -> (file digest, entry file)
+        self.catalogues: Dict[str, Tuple[str, str]] = {}
+        # character path -> (character and catalogue digests, entry file)
+        self.characters: Dict[str, Tuple[str, str]] = {}
+        self.changed = False
+        self._digests: Dict[str, str] = {}
+        # Entry files replaced or dropped since loading; deleted on save
+        self._stale: Set[str] = set()
+
+    @classmethod
+    def load(cls, path: Path) -> "DatasetSnapshot":
+        """Index of the snapshot at ``path``; empty when missing, unreadable or outdated."""
+        snapshot = cls(path)
+        try:
+            with (snapshot.path / INDEX_NAME).open("rb") as handle:
+                data = pickle.load(handle)
+        except (OSError, EOFError, AttributeError, ValueError, pickle.UnpicklingError):
+            return snapshot
+        if isinstance(data, dict) and data.get("version") == _version():
+            snapshot.catalogues = data["catalogues"]
+            snapshot.characters = data["characters"]
+        return snapshot
+
+    def save(self) -> bool:
+        """Write the index if anything was added or dropped; entries are written as they come."""
+        if not self.changed:
+            return False
+        if self.path.is_file():
+            # A single-file snapshot from an older version
+            self.path.unlink()
+        payload = {"version": _version(), "catalogues": self.catalogues, "characters": self.characters}
+        write_if_changed(self.path / INDEX_NAME, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+        used = {name for _, name in self.catalogues.values()} | {name for _, name in self.characters.values()}
+        for name in self._stale - used:
+            try:
+                (self.path / "entries" / name).unlink()
+            except OSError:
+                pass
+        self._stale.clear()
+        self.changed = False
+        return True
+
+    def _read(self, name: str) -> Optional[Any]:
+        try:
+            with (self.path / "entries" / name).open("rb") as handle:
+                return pickle.load(handle)
+        except (OSError, EOFError, AttributeError, ValueError, pickle.UnpicklingError):
+            return None
+
+    def _write(self, table: Dict[str, Tuple[str, str]], key: str, digest: str, value: Any) -> None:
+        if self.path.is_file():
+            self.path.unlink()
+        name = _entry_name(key, digest)
+        write_if_changed(self.path / "entries" / name, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        self._drop(table, key)
+        table[key] = (digest, name)
+        self.changed = True
+
+    def _drop(self, table: Dict[str, Tuple[str, str]], key: str) -> None:
+        entry = table.pop(key, None)
+        if entry is not None:
+            self._stale.add(entry[1])
+            self.changed = True
+
+    def digest(self, path: Path) -> str:
+        """Content digest of an input file, hashed once per snapshot."""
+        key = _key(path)
+        if key not in self._digests:
+            self._digests[key] = file_digest(path) if Path(path).exists() else ""
+        return self._digests[key]
+
+    def catalogue(self, path: Path) -> Optional[Dict[str, Dict[str, Any]]]:
+        entry = self.catalogues.get(_key(path))
+        if entry is None or entry[0] != self.digest(path):
+            return None
+        return self._read(entry[1])
+
+    def put_catalogue(self, path: Path, index: Dict[str, Dict[str, Any]]) -> None:
+        self._write(self.catalogues, _key(path), self.digest(path), index)
+
+    def _character_digest(self, path: Path, vocabulary: VocabularyProcessor) -> str:
+        catalogues = ":".join(self.digest(catalogue) for catalogue in vocabulary.catalogue_paths())
+        return f"{self.digest(path)}:{catalogues}"
+
+    def has_character(self, path: Path, vocabulary: VocabularyProcessor) -> bool:
+        entry = self.characters.get(_key(path))
+        return entry is not None and entry[0] == self._character_digest(path, vocabulary)
+
+    def character(
+        self, path: Path, vocabulary: VocabularyProcessor
+    ) -> Optional[Tuple[Dict[str, Any], Set[str]]]:
+        """Enriched character and the catalogue keys it used, or None if stale."""
+        if not self.has_character(path, vocabulary):
+            return None
+        return self._read(self.characters[_key(path)][1])
+
+    def put_character(
+        self, path: Path, vocabulary: VocabularyProcessor, character: Dict[str, Any], keys: Set[str]
+    ) -> None:
+        self._write(self.characters, _key(path), self._character_digest(path, vocabulary), (character, keys))
+
+    def refresh(
+        self,
+        pages: Iterable[Tuple[Book, Path]],
+        vocabulary_for: Callable[[Book], VocabularyProcessor],
+        roster: Optional[Iterable[Tuple[Book, Path]]] = None,
+    ) -> int:
+        """Parse and enrich every stale character, drop removed ones; return how many were parsed.
+
+        Characters outside ``roster`` (all of ``pages`` by default) count as
+        removed; a shard passes the whole roster so it keeps the others.
+        """
+        parsed = 0
+        present = {_key(char_file) for _, char_file in roster} if roster is not None else set()
+        for book, char_file in pages:
+            present.add(_key(char_file))
+            vocabulary = vocabulary_for(book)
+            vocabulary.use_snapshot(self)
+            if self.has_character(char_file, vocabulary):
+                continue
+            try:
+                with Path(char_file).open("r", encoding="utf-8") as handle:
+                    character = json.load(handle)
+                keys = vocabulary.enrich_character(character)
+            except Exception:  # noqa: BLE001 - the page build reports the error
+                self._drop(self.characters, _key(char_file))
+                continue
+            self.put_character(char_file, vocabulary, character, keys)
+            parsed += 1
+        for key in set(self.characters) - present:
+            self._drop(self.characters, key)
+        return parsed
+
+
+def load_dataset(config: Any) -> Iterator[Tuple[Book, Path, Dict[str, Any]]]:
+    """Every book's enriched characters, via ``config.DATASET_SNAPSHOT``.
+
+    Meant for scripts: the snapshot is brought up to date first, so only
+    edited files are parsed again. A character file that cannot be parsed
+    or enriched raises ValueError naming the file.
+    """
+    books = discover_books(config)
+    shared = VocabularyProcessor(config.DATA_DIR)
+    vocabularies = {book.id: book.vocabulary(shared) for book in books}
+    pages: List[Tuple[Book, Path]] = [
+        (book, book.character_file(char_id))
+        for book in books
+        for char_id in book.character_order
+        if book.character_file(char_id).exists()
+    ]
+    path = getattr(config, "DATASET_SNAPSHOT", None)
+    # Without a configured directory the snapshot only lives for this call
+    with tempfile.TemporaryDirectory(prefix="dataset-") as scratch:
+        snapshot = DatasetSnapshot.load(path or scratch)
+        snapshot.refresh(pages, lambda book: vocabularies[book.id])
+        snapshot.save()
+        for book, char_file in pages:
+            entry = snapshot.character(char_file, vocabularies[book.id])
+            if entry is None:
+                raise ValueError(f"cannot load character file {char_file}")
+            yield book, char_file, entry[0]
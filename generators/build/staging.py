@@ -0,0 +1,178 @@
+"""Build into a staging directory and swap it over the live output."""
+from __future__ import annotations
+
+import ctypes
+import os
+import shutil
+import sys
+import uuid
+from pathlib import Path
+from typing import IO, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+# Written into the staging tree by prepare() and checked by commit()
+_TOKEN_NAME = ".staging-token"
+
+
+def _exchange(first: Path, second: Path) -> bool:
+    """Atomically swap two paths with renameat2(RENAME_EXCHANGE) where available."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return False
+    renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    renameat2.restype = ctypes.c_int
+    result = renameat2(
+        _AT_FDCWD, os.fsencode(str(first)), _AT_FDCWD, os.fsencode(str(second)), _RENAME_EXCHANGE
+    )
+    return result == 0
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class StagedOutput:
+    """Write a build next to the live tree, then swap it in with a rename.
+
+    ``output.staging`` starts as a hardlinked mirror of ``output`` so that
+    incremental builds only replace what changed; every writer replaces files
+    through a rename, so the live tree is never modified. After ``commit`` the
+    previous tree is kept as ``output.previous`` for ``rollback``.
+
+    There is one staging tree per output, so ``prepare`` takes an exclusive
+    lock on ``output.lock`` and ``commit``/``discard`` release it: builds of
+    the same output (CLI, ``--watch``, the daemon) wait for each other.
+    """
+
+    def __init__(self, target: Path) -> None:
+        self.target = Path(target)
+        self.staging = self.target.with_name(f"{self.target.name}.staging")
+        self.previous = self.target.with_name(f"{self.target.name}.previous")
+        self.lock_path = self.target.with_name(f"{self.target.name}.lock")
+        self._lock: Optional[IO[bytes]] = None
+        self._token = ""
+
+    def prepare(self) -> Path:
+        """Lock the output and create a fresh staging tree seeded from it."""
+        self.lock()
+        # Left over from a build that died; nobody else can be using it
+        self._remove(self.staging)
+        if self.target.exists():
+            shutil.copytree(self.target, self.staging, copy_function=_link_or_copy, symlinks=True)
+        else:
+            self.staging.mkdir(parents=True)
+        self._token = uuid.uuid4().hex
+        (self.staging / _TOKEN_NAME).write_text(self._token, encoding="utf-8")
+        return self.staging
+
+    def commit(self) -> None:
+        """Swap the staged build into place and keep the old tree as previous.
+
+        Raises RuntimeError, leaving the live tree alone, when the staging
+        tree is not the one ``prepare`` made (removed by hand or by a build
+        that ignored the lock; writers may have recreated parts of it).
+        """
+        try:
+            token = self.staging / _TOKEN_NAME
+            try:
+                intact = token.read_text(encoding="utf-8") == self._token
+            except OSError:
+                intact = False
+            if not intact:
+                self._remove(self.staging)
+                raise RuntimeError(f"staging tree {self.staging} was replaced during the build")
+            token.unlink()
+            if not self.target.exists():
+                os.replace(self.staging, self.target)
+            elif _exchange(self.staging, self.target):
+                # The old tree now sits at the staging path.
+                self._remove(self.previous)
+                os.replace(self.staging, self.previous)
+            else:
+                # Fallback: two renames, leaving a very short window without a target.
+                self._remove(self.previous)
+                os.replace(self.target, self.previous)
+                os.replace(self.staging, self.target)
+        finally:
+            self.unlock()
+
+    def rollback(self) -> bool:
+        """Swap the previous tree back in; running it again rolls forward."""
+        self.lock()
+        try:
+            if not self.previous.exists():
+                return False
+            if not self.target.exists():
+                os.replace(self.previous, self.target)
+            elif not _exchange(self.previous, self.target):
+                self._remove(self.staging)
+                os.replace(self.target, self.staging)
+                os.replace(self.previous, self.target)
+                os.replace(self.staging, self.previous)
+            return True
+        finally:
+            self.unlock()
+
+    def discard(self) -> None:
+        """Drop the staging tree of this build and release the lock (no-op if not prepared)."""
+        if self._lock is None:
+            return
+        try:
+            self._remove(self.staging)
+        finally:
+            self.unlock()
+
+    def lock(self) -> None:
+        """Take the exclusive output lock, waiting while another build holds it."""
+        if self._lock is not None:
+            return
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        handle = self.lock_path.open("a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            else:
+                handle.seek(0)
+                while True:
+                    try:
+                        # LK_LOCK itself gives up after about 10 seconds
+                        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        except BaseException:
+            handle.close()
+            raise
+        self._lock = handle
+
+    def unlock(self) -> None:
+        if self._lock is None:
+            return
+        handle, self._lock = self._lock, None
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            handle.close()
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        if path.exists():
+            shutil.rmtree(path)
@@ -0,0 +1,142 @@
+"""Poll the source trees and rebuild what changed (``main.py --watch``)."""
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .books import discover_books
+from .site import BuildOptions, BuildReport, SiteBuilder
+
+Snapshot = Dict[Path, Tuple[int, int]]
+
+
+def _ignored(name: str) -> bool:
+    # Our own temp files (.name.tmp) and editor swap/backup files
+    return name.startswith(".") or name.endswith(("~", ".swp", ".tmp"))
+
+
+def snapshot(roots: Iterable[Path]) -> Snapshot:
+    """``(mtime_ns, size)`` of every file below ``roots``."""
+    state: Snapshot = {}
+    stack = [Path(root) for root in roots if Path(root).is_dir()]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if _ignored(entry.name) or entry.name == "__pycache__":
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                elif entry.is_file():
+                    stat = entry.stat()
+                    state[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+    return state
+
+
+def changed_paths(old: Snapshot, new: Snapshot) -> Set[Path]:
+    """Files added, removed or modified between two snapshots."""
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+class Watcher:
+    """Rebuild the site whenever data, templates or static files change.
+
+    Changes are collected until nothing new has appeared for ``debounce``
+    seconds, so an editor saving several files triggers one rebuild. Edited
+    character files rebuild just those pages; anything else runs the normal
+    incremental build, where the manifest picks the affected outputs.
+    """
+
+    def __init__(
+        self,
+        config: Any,
+        options: BuildOptions,
+        interval: float = 0.25,
+        debounce: float = 0.3,
+        printer: Callable[..., None] = print,
+    ) -> None:
+        self.config = config
+        # Rebuilds run in-process so the generators stay warm.
+        self.options = replace(options, jobs=1, verbose=False)
+        self.interval = interval
+        self.debounce = debounce
+        self.printer = printer
+        self.builder = SiteBuilder(config, printer=printer)
+        base_dir = Path(config.BASE_DIR)
+        self.roots = [Path(config.DATA_DIR), base_dir / "templates", base_dir / "static"]
+        self._state = snapshot(self.roots)
+
+    def poll(self) -> Set[Path]:
+        """Changes since the previous poll."""
+        state = snapshot(self.roots)
+        changed = changed_paths(self._state, state)
+        self._state = state
+        return changed
+
+    def wait_for_changes(self) -> Set[Path]:
+        """Block until something changed and the burst has settled."""
+        changed: Set[Path] = set()
+        while not changed:
+            time.sleep(self.interval)
+            changed = self.poll()
+        quiet_since = time.monotonic()
+        while time.monotonic() - quiet_since < self.debounce:
+            time.sleep(min(self.interval, self.debounce))
+            more = self.poll()
+            if more:
+                changed |= more
+                quiet_since = time.monotonic()
+        return changed
+
+    def options_for(self, changed: Set[Path]) -> BuildOptions:
+        """Narrowest build that covers ``changed``."""
+        characters: Dict[str, Set[str]] = {}
+        for book in discover_books(self.config):
+            for path in changed:
+                if path.parent == book.characters_dir and path.suffix == ".json" and path.exists():
+                    characters.setdefault(book.id, set()).add(path.stem)
+        targeted = sum(len(names) for names in characters.values())
+        if targeted == len(changed):
+            return replace(
+                self.options,
+                characters=sorted(set().union(*characters.values())),
+                books=sorted(characters),
+                assets=False,
+            )
+        static_dir = Path(self.config.BASE_DIR) / "static"
+        training = Path(self.config.BASE_DIR) / "templates" / "training.html"
+        assets = any(path == training or static_dir in path.parents for path in changed)
+        return replace(self.options, assets=assets)
+
+    def rebuild(self, changed: Set[Path]) -> BuildReport:
+        started = time.perf_counter()
+        report = self.builder.build(self.options_for(changed))
+        latency = time.perf_counter() - started
+        sync = report.sync_report
+        base_dir = Path(self.config.BASE_DIR)
+        names = sorted(str(path.relative_to(base_dir)) if base_dir in path.parents else str(path) for path in changed)
+        shown = ", ".join(names[:3]) + (f" (+{len(names) - 3} more)" if len(names) > 3 else "")
+        self.printer(
+            f"[WATCH] {shown} -> {report.generated} page(s), index {report.index_status}, "
+            f"{len(sync.copied) + len(sync.removed)} asset(s) in {latency * 1000:.0f}ms"
+        )
+        for result in report.failures:
+            self.printer(f"[ERROR] {result.name}: {result.error}")
+        return report
+
+    def run(self, max_rebuilds: Optional[int] = None) -> List[BuildReport]:
+        """Watch until interrupted (or after ``max_rebuilds`` rebuilds)."""
+        reports: List[BuildReport] = []
+        self.printer(f"[WATCH] Watching {', '.join(str(root) for root in self.roots)} (Ctrl+C to stop)")
+        while max_rebuilds is None or len(reports) < max_rebuilds:
+            reports.append(self.rebuild(self.wait_for_changes()))
+        return reports
@@ -0,0 +1,56 @@
+"""Static files generated at build time and published under content-hashed names."""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict
+
+from utils.file_operations import fingerprinted_name
+
+from .js import JavaScriptGenerator
+from .js.fragments import load_runtime
+from .mnemonics_gen import MnemonicsGenerator
+
+# The content hash fingerprinted_name() puts before the extension
+_FINGERPRINT_RE = re.compile(r"\.[0-9a-f]{10}(?=\.[^./]*$|$)")
+
+
+@dataclass(frozen=True)
+class GeneratedAsset:
+    """A generated file; ``path`` is relative to the site root."""
+
+    path: str
+    content: str
+
+
+def journey_assets(config: Any) -> Dict[str, GeneratedAsset]:
+    """Files shared by every journey page, keyed by role.
+
+    ``mnemonics_css`` holds the article colour styles built from
+    ``MnemonicsGenerator.GENDER_COLORS``; ``journey_js`` is the journey
+    runtime followed by the mnemonic scripts, so a page inlines nothing
+    but its character data. Names carry a hash of the content: a page
+    links the exact version it was built with, and browsers may cache
+    the files for good.
+
+    The set follows ``static/js/journey_runtime.js``: a long-lived build
+    process picks up an edited runtime under its new name.
+    """
+    return _journey_assets(config, load_runtime())
+
+
+@lru_cache(maxsize=4)
+def _journey_assets(config: Any, runtime: str) -> Dict[str, GeneratedAsset]:
+    mnemonics = MnemonicsGenerator(config)
+    css = mnemonics.generate_css()
+    js = JavaScriptGenerator(lambda: runtime).shared() + "\n" + mnemonics.generate_javascript()
+    return {
+        "mnemonics_css": GeneratedAsset(f"static/css/{fingerprinted_name('mnemonics.css', css)}", css),
+        "journey_js": GeneratedAsset(f"static/js/{fingerprinted_name('journey.js', js)}", js),
+    }
+
+
+def asset_family(path: str) -> str:
+    """``static/js/journey.<hash>.js`` -> ``static/js/journey.js``; other paths are returned as is."""
+    return _FINGERPRINT_RE.sub("", path)
@@ -1,11 +1,27 @@
 """HTML generation helpers for Lira journey pages."""
 
-from .head_generator import HeadContext, HeadGenerator
-from .journey_builder import JourneyAssets, JourneyBuilder
-from .template_engine import JourneyTemplateEngine, TemplateContext
-from .vocabulary_processor import VocabularyProcessor
+from typing import TYPE_CHECKING
+
+from utils.lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .head_generator import HeadContext, HeadGenerator
+    from .journey_builder import BUILDER_VERSION, JourneyAssets, JourneyBuilder
+    from .template_engine import JourneyTemplateEngine, TemplateContext
+    from .vocabulary_processor import VocabularyProcessor
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        ".head_generator": ("HeadContext", "HeadGenerator"),
+        ".journey_builder": ("BUILDER_VERSION", "JourneyAssets", "JourneyBuilder"),
+        ".template_engine": ("JourneyTemplateEngine", "TemplateContext"),
+        ".vocabulary_processor": ("VocabularyProcessor",),
+    },
+)
 
 __all__ = [
+    "BUILDER_VERSION",
     "HeadContext",
     "HeadGenerator",
     "JourneyAssets",
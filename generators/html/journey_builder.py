@@ -4,9 +4,11 @@ import json
 import random
 import re
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 from .vocabulary_processor import VocabularyProcessor
 
+# Bump when JourneyAssets change shape; cached artifacts are keyed on it.
+BUILDER_VERSION = 2
 
 @dataclass
 class JourneyAssets:
@@ -22,10 +24,35 @@ class JourneyBuilder:
     def __init__(self, vocabulary: VocabularyProcessor) -> None:
         self.vocabulary = vocabulary
 
-    def prepare(self, character: Dict[str, Any]) -> JourneyAssets:
+    def prepare(
+        self,
+        character: Dict[str, Any],
+        reuse: Optional[JourneyAssets] = None,
+        only_phases: Optional[Set[str]] = None,
+        seed: str = "",
+    ) -> JourneyAssets:
+        """Build the interactive data for every phase.
+
+        Quiz choices are shuffled by a generator seeded from ``seed``, the
+        character id and the phase id, so the same inputs always give the
+        same page. With ``only_phases`` the quizzes, constructor sentences and exercise of
+        the other phases are taken from ``reuse`` (a previous build) instead of
+        being generated again; phases missing from ``reuse`` are rebuilt.
+        """
         phases = list(character.get("journey_phases", []))
         self._ensure_phase_ids(phases)
-        exercises, quizzes, quizzes_json = self._prepare_interactions(phases)
+        reused: Dict[str, Tuple[Dict[str, Any], Optional[Dict[str, Any]]]] = {}
+        if only_phases is not None:
+            unknown = sorted(only_phases - {phase["id"] for phase in phases})
+            if unknown:
+                raise ValueError(f"unknown phase id(s) for {character.get('id', '?')}: {', '.join(unknown)}")
+            if reuse is not None:
+                old_exercises = {exercise["phase_id"]: exercise for exercise in reuse.exercises}
+                for phase in reuse.phases:
+                    if phase.get("id") not in only_phases:
+                        reused[phase["id"]] = (phase, old_exercises.get(phase["id"]))
+        rng_prefix = f"{seed}:{character.get('id', '')}"
+        exercises, quizzes, quizzes_json = self._prepare_interactions(phases, reused, rng_prefix)
         metadata = self.vocabulary.relations_metadata(phases)
         return JourneyAssets(phases, exercises, quizzes, quizzes_json, metadata)
 
@@ -34,24 +61,46 @@ class JourneyBuilder:
         count = len(phases)
         return 0 if count == 0 else max(1, int(100 / count))
 
+    @staticmethod
+    def phase_rng(prefix: str, phase_id: str) -> random.Random:
+        """Private RNG of one phase; independent of the global ``random`` state.
+
+        String seeds are hashed with SHA-512, so the sequence is the same in
+        every process regardless of ``PYTHONHASHSEED``.
+        """
+        return random.Random(f"{prefix}:{phase_id}")
+
     @staticmethod
     def _ensure_phase_ids(phases: List[Dict[str, Any]]) -> None:
         for index, phase in enumerate(phases):
             phase.setdefault("id", f"phase-{index}")
 
-    def _prepare_interactions(self, phases: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], str]:
+    def _prepare_interactions(
+        self,
+        phases: List[Dict[str, Any]],
+        reused: Dict[str, Tuple[Dict[str, Any], Optional[Dict[str, Any]]]],
+        rng_prefix: str = "",
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], str]:
         exercises: List[Dict[str, Any]] = []
         quizzes: List[Dict[str, Any]] = []
         quizzes_map: Dict[str, List[Dict[str, Any]]] = {}
         for index, phase in enumerate(phases):
             phase_id = phase.get("id", f"phase-{index}")
-            vocab_words, constructor_entries = self._collect_vocabulary(phase)
-            phase["sentence_parts"] = constructor_entries
-            phase_quizzes = self._build_phase_quizzes(phase, vocab_words)
+            if phase_id in reused:
+                # Reuse the derived data of an untouched phase
+                old_phase, exercise = reused[phase_id]
+                phase["sentence_parts"] = old_phase.get("sentence_parts", [])
+                phase_quizzes = old_phase.get("quizzes", [])
+                if exercise:
+                    exercise = dict(exercise, is_active=index == 0)
+            else:
+                vocab_words, constructor_entries = self._collect_vocabulary(phase)
+                phase["sentence_parts"] = constructor_entries
+                phase_quizzes = self._build_phase_quizzes(phase, vocab_words, self.phase_rng(rng_prefix, phase_id))
+                exercise = self._build_exercise(index, phase, phase_id)
             phase["quizzes"] = phase_quizzes
             quizzes.append({"phase_id": phase_id, "questions": phase_quizzes, "is_active": index == 0})
             quizzes_map[phase_id] = phase_quizzes
-            exercise = self._build_exercise(index, phase, phase_id)
             if exercise:
                 exercises.append(exercise)
         return exercises, quizzes, json.dumps(quizzes_map, ensure_ascii=False)
@@ -79,7 +128,12 @@ class JourneyBuilder:
                 )
         return vocab_words, constructor_entries
 
-    def _build_phase_quizzes(self, phase: Dict[str, Any], vocabulary_words: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    def _build_phase_quizzes(
+        self,
+        phase: Dict[str, Any],
+        vocabulary_words: List[Tuple[str, str]],
+        rng: random.Random,
+    ) -> List[Dict[str, Any]]:
         existing = list(phase.get("quizzes", []))
         referenced = {
             word.lower()
@@ -93,7 +147,7 @@ class JourneyBuilder:
                     continue
                 distractors = [t for t in translations if t.lower() != russian.lower()]
                 if len(distractors) > 3:
-                    distractors = random.sample(distractors, 3)
+                    distractors = rng.sample(distractors, 3)
                 new_quiz = {
                     "question": f"Что означает немецкое слово «{german}»?",
                     "choices": [russian, *distractors],
@@ -106,7 +160,7 @@ class JourneyBuilder:
             choices = list(quiz.get("choices", []))
             correct_index = quiz.get("correct_index", quiz.get("correctIndex", 0))
             correct_choice = choices[correct_index] if 0 <= correct_index < len(choices) else None
-            random.shuffle(choices)
+            rng.shuffle(choices)
             correct_index = choices.index(correct_choice) if correct_choice in choices else (0 if choices else 0)
             phase_quizzes.append({"question": quiz.get("question", ""), "choices": choices, "correct_index": correct_index})
         return phase_quizzes
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, TYPE_CHECKING
+from typing import Any, Dict, Iterator, List, TYPE_CHECKING
 
 from .head_generator import HeadContext
 
@@ -20,7 +20,16 @@ class TemplateContext:
     head: HeadContext
     navigation: Dict[str, Any]
     relations_metadata: Dict[str, Dict[str, bool]]
-    js_bundle: str
+    # Inline script: the serialized character data.
+    js_payload: str
+    # Mnemonic vocabulary section, rendered after the theatrical scenes.
+    mnemo_vocabulary: str = ""
+    # Site-relative path of the shared mnemonic stylesheet, if any.
+    mnemo_css: str = ""
+    # Site-relative path of the shared runtime script bundle, if any.
+    js_bundle: str = ""
+    # Relative path from the page back to the site root (static/, index.html).
+    root: str = "../"
 
 
 class JourneyTemplateEngine:
@@ -30,8 +39,15 @@ class JourneyTemplateEngine:
         self.base_generator = base_generator
 
     def render(self, context: TemplateContext) -> str:
-        return self.base_generator.render_template(
-            "journey.html",
+        return self.base_generator.render_template("journey.html", **self._variables(context))
+
+    def stream(self, context: TemplateContext) -> Iterator[str]:
+        """Render the page as a stream of text chunks."""
+        return self.base_generator.stream_template("journey.html", **self._variables(context))
+
+    @staticmethod
+    def _variables(context: TemplateContext) -> Dict[str, Any]:
+        return dict(
             character=context.character,
             journey_phases=context.phases,
             exercises=context.exercises,
@@ -41,6 +57,10 @@ class JourneyTemplateEngine:
             initial_progress=context.head.initial_progress,
             first_phase_title=context.head.first_phase_title,
             relations_metadata=context.relations_metadata,
-            js=context.js_bundle,
+            js=context.js_payload,
+            js_bundle=context.js_bundle,
+            mnemo_vocabulary=context.mnemo_vocabulary,
+            mnemo_css=context.mnemo_css,
             navigation=context.navigation,
+            root=context.root,
         )
@@ -1,8 +1,9 @@
 """Vocabulary enrichment helpers for journey pages."""
 from __future__ import annotations
-import json, re
+import hashlib, json, re
+from collections import ChainMap
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
 from utils.text_processing import collapse_whitespace
 
 _VARIANT_OVERRIDES = {
@@ -11,6 +12,8 @@ _VARIANT_OVERRIDES = {
     "правда": "правду", "конец": "концом", "слеза": "слезы",
     "нужда": "нужде", "вечный": "вечна",
 }
+# Catalogue fields copied into character words by ``_apply_defaults``.
+_ENRICH_FIELDS = ("word_family", "synonyms", "visual_hint", "themes")
 
 def _ensure_list(value: Any) -> List[str]:
     if not value:
@@ -22,34 +25,103 @@ def _ensure_list(value: Any) -> List[str]:
     return [str(value).strip()]
 
 class VocabularyProcessor:
-    """Load shared vocabulary and enrich character data."""
+    """Load shared vocabulary and enrich character data.
 
-    def __init__(self, data_dir: Path) -> None:
+    A processor built with ``base`` only loads its own catalogue and falls
+    back to the base one, so a book overlay shares the common entries.
+    """
+
+    def __init__(self, data_dir: Path, base: Optional["VocabularyProcessor"] = None) -> None:
         self.vocabulary_path = Path(data_dir) / "vocabulary" / "vocabulary.json"
-        self._cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self.base = base
+        self._cache: Optional[Mapping[str, Dict[str, Any]]] = None
+        self._digests: Dict[str, str] = {}
+        self._signature: Optional[tuple] = None
+        # Optional DatasetSnapshot holding the parsed catalogue.
+        self.snapshot: Optional[Any] = None
+
+    def use_snapshot(self, snapshot: Optional[Any]) -> None:
+        """Read parsed catalogues from ``snapshot`` (this one and its bases)."""
+        self.snapshot = snapshot
+        if self.base:
+            self.base.use_snapshot(snapshot)
+
+    def catalogue_paths(self) -> List[Path]:
+        """Catalogue files this processor reads, own file first."""
+        return [self.vocabulary_path] + (self.base.catalogue_paths() if self.base else [])
 
-    def load_cache(self) -> Dict[str, Dict[str, Any]]:
+    def _file_signature(self) -> Optional[tuple]:
+        try:
+            stat = self.vocabulary_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load_cache(self) -> Mapping[str, Dict[str, Any]]:
+        # Long-lived processes (build daemon, watch mode) pick up catalogue edits.
+        base_cache = self.base.load_cache() if self.base else None
+        signature = (self._file_signature(), self.base._signature if self.base else None)
+        if signature != self._signature:
+            if self._signature is not None:
+                # The snapshot of an earlier build still holds the old catalogue
+                self.snapshot = None
+            self._cache, self._digests, self._signature = None, {}, signature
         if self._cache is None:
-            data = []
-            if self.vocabulary_path.exists():
-                with self.vocabulary_path.open("r", encoding="utf-8") as handle:
-                    data = json.load(handle).get("vocabulary", [])
-            self._cache = {
-                collapse_whitespace(entry.get("german", "")).lower(): entry
-                for entry in data
-                if collapse_whitespace(entry.get("german", ""))
-            }
+            own = self.snapshot.catalogue(self.vocabulary_path) if self.snapshot else None
+            if own is None:
+                own = self._parse_catalogue()
+                if self.snapshot is not None:
+                    self.snapshot.put_catalogue(self.vocabulary_path, own)
+            self._cache = ChainMap(own, base_cache) if base_cache is not None else own
         return self._cache
 
-    def enrich_character(self, character: Dict[str, Any]) -> None:
+    def _parse_catalogue(self) -> Dict[str, Dict[str, Any]]:
+        data = []
+        if self.vocabulary_path.exists():
+            with self.vocabulary_path.open("r", encoding="utf-8") as handle:
+                data = json.load(handle).get("vocabulary", [])
+        return {
+            collapse_whitespace(entry.get("german", "")).lower(): entry
+            for entry in data
+            if collapse_whitespace(entry.get("german", ""))
+        }
+
+    def enrich_character(self, character: Dict[str, Any]) -> Set[str]:
+        """Fill words from the catalogue and return every catalogue key looked up."""
         vocab_index = self.load_cache()
+        used: Set[str] = set()
         if not vocab_index:
-            return
+            return used
         for phase in character.get("journey_phases", []):
             for word in phase.get("vocabulary", []):
-                entry = vocab_index.get(collapse_whitespace(word.get("german", "")).lower())
+                key = collapse_whitespace(word.get("german", "")).lower()
+                used.add(key)
+                entry = vocab_index.get(key)
                 if entry:
                     self._apply_defaults(word, entry)
+        return used
+
+    def entry_digest(self, key: str) -> str:
+        """Digest of the enrichment fields of one catalogue entry ("" when absent)."""
+        # load_cache() first: it drops the digests when the catalogue changed
+        return self._entry_digest(key, self.load_cache())
+
+    def entry_digests(self, keys: Iterable[str]) -> Dict[str, str]:
+        cache = self.load_cache()
+        return {key: self._entry_digest(key, cache) for key in sorted(keys)}
+
+    def _entry_digest(self, key: str, cache: Mapping[str, Dict[str, Any]]) -> str:
+        if key not in self._digests:
+            entry = cache.get(key)
+            if entry is None:
+                return ""
+            payload = json.dumps(
+                {field: entry.get(field) for field in _ENRICH_FIELDS},
+                ensure_ascii=False,
+                sort_keys=True,
+            )
+            self._digests[key] = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        return self._digests[key]
 
     @staticmethod
     def _apply_defaults(word: Dict[str, Any], entry: Dict[str, Any]) -> None:
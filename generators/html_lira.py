@@ -1,58 +1,245 @@
 """HTML Generator for Lira Journey pages."""
 from __future__ import annotations
 
+import hashlib
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, Iterable, List, Optional, Set
 
 from .base import BaseGenerator
+from .generated_assets import journey_assets
 from .mnemonics_gen import MnemonicsGenerator
 from .html import (
+    BUILDER_VERSION,
     HeadGenerator,
+    JourneyAssets,
     JourneyBuilder,
     JourneyTemplateEngine,
     TemplateContext,
     VocabularyProcessor,
 )
-from .js_lira import LiraJSGenerator
+from .html import journey_builder, vocabulary_processor
+from .js import PhaseSerializer, serializer
+from utils.artifact_cache import ArtifactCache
+from utils.file_operations import file_digest
+from utils.html_rewriter import HTMLRewriter
+from utils.pipeline import Pipeline, Stage
+from utils.text_processing import compact_html
+from utils.timing import StageTimer
+
+
+@lru_cache(maxsize=1)
+def _artifact_version() -> str:
+    """Builder version plus the source of every module that shapes cached artifacts."""
+    modules = (journey_builder, vocabulary_processor, serializer)
+    sources = ",".join(file_digest(Path(module.__file__)) for module in modules)
+    return f"{BUILDER_VERSION}:{sources}"
+
+
+@dataclass
+class JourneyPage:
+    """A rendered journey page and what the build needs to know about it."""
+
+    # The page text; None when it was streamed straight to disk.
+    html: Optional[str]
+    character: Dict[str, Any]
+    # Catalogue keys looked up while enriching the character.
+    vocabulary_keys: Set[str] = field(default_factory=set)
+    # Whether the write stage changed the file on disk.
+    changed: bool = False
+    # Size of the page in bytes (UTF-8).
+    size: int = 0
+    # Site-relative generated files the page links (mnemonics.<hash>.css, journey.<hash>.js).
+    shared_files: List[str] = field(default_factory=list)
 
 
 class LiraHTMLGenerator(BaseGenerator):
-    """Generate complete HTML pages in Lira journey style."""
+    """Generate complete HTML pages in Lira journey style.
 
-    def __init__(self, config: Any) -> None:
+    A page is produced by ``self.pipeline``: load, enrich, prepare,
+    serialize, render, postprocess, optimize and write.
+    Stages can be added or replaced through the ``Pipeline`` API; prepare
+    and serialize are cached in the artifact cache keyed on their inputs.
+
+    From render on, ``html`` is a lazy stream of text chunks: the template
+    is rendered while postprocess rewrites it and write saves it, so a
+    page is never held in memory whole (optimize, when enabled, is the
+    exception). Each stage is still timed separately.
+    """
+
+    def __init__(
+        self,
+        config: Any,
+        vocabulary: Optional[VocabularyProcessor] = None,
+        root: str = "../",
+    ) -> None:
         super().__init__(config)
-        self.vocabulary = VocabularyProcessor(self.config.DATA_DIR)
+        self.vocabulary = vocabulary or VocabularyProcessor(self.config.DATA_DIR)
+        # Relative path from a journey page back to the site root.
+        self.root = root
         self.journey_builder = JourneyBuilder(self.vocabulary)
         self.head_generator = HeadGenerator()
         self.template_engine = JourneyTemplateEngine(self)
         self.mnemo_gen = MnemonicsGenerator(config)
+        # Optional output stages, off unless enabled in config.
+        self.minify = bool(getattr(config, "MINIFY_HTML", False))
+        self.precompress = bool(getattr(config, "PRECOMPRESS_HTML", False))
+        # Seed of the quiz shuffling; part of the prepare cache key.
+        self.seed = str(getattr(config, "BUILD_SEED", ""))
+        # Per-stage timings, collected by the build when profiling.
+        self.timer = StageTimer()
+        # Cache of prepared assets and serialized phase data (None disables it).
+        cache_dir = getattr(config, "ARTIFACT_CACHE_DIR", None)
+        self.artifacts: Optional[ArtifactCache] = None
+        if cache_dir:
+            self.artifacts = ArtifactCache(cache_dir, getattr(config, "ARTIFACT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+        # Parsed dataset (DatasetSnapshot) to load characters from, if any.
+        self.dataset: Optional[Any] = None
+        self.pipeline = self._journey_pipeline()
+
+    def use_dataset(self, dataset: Optional[Any]) -> None:
+        """Take enriched characters and the catalogue from a ``DatasetSnapshot``."""
+        self.dataset = dataset
+        self.vocabulary.use_snapshot(dataset)
+
+    def _journey_pipeline(self) -> Pipeline:
+        version = _artifact_version()
+        return Pipeline(
+            [
+                Stage("load", self._load_stage, inputs=("character_file",)),
+                # Skipped when the load stage took an enriched character from the snapshot
+                Stage(
+                    "enrich",
+                    self._enrich_stage,
+                    inputs=("character",),
+                    when=lambda state: "vocabulary_keys" not in state,
+                ),
+                Stage(
+                    "prepare",
+                    self._prepare_stage,
+                    inputs=("character", "only_phases", "reuse_key", "seed"),
+                    cached=True,
+                    version=version,
+                    # vars() instead of asdict(): no deep copy, the value is dumped at once.
+                    dump=lambda outputs: {"assets": vars(outputs["assets"])},
+                    restore=lambda data: {"assets": JourneyAssets(**data["assets"])},
+                ),
+                Stage(
+                    "serialize",
+                    self._serialize_stage,
+                    inputs=("character", "assets"),
+                    cached=True,
+                    version=version,
+                ),
+                Stage("render", self._render_stage, inputs=("character", "assets", "header")),
+                Stage("postprocess", self._postprocess_stage, inputs=("html", "page_character")),
+                Stage("optimize", self._optimize_stage, inputs=("html",), when=lambda state: self.minify),
+                Stage(
+                    "write",
+                    self._write_stage,
+                    inputs=("html", "output_path"),
+                    when=lambda state: state["output_path"] is not None,
+                ),
+            ],
+            timer=self.timer,
+        )
 
     def generate_journey(self, character_file: Path) -> str:
-        character = self.load_character(character_file)
-        self.vocabulary.enrich_character(character)
-        assets = self.journey_builder.prepare(character)
-        character["journey_phases"] = assets.phases
+        return self.build_journey(character_file).html
+
+    def build_journey(
+        self,
+        character_file: Path,
+        phases: Optional[Set[str]] = None,
+        output_path: Optional[Path] = None,
+    ) -> JourneyPage:
+        """Render one journey page and write it to ``output_path`` if given.
+
+        ``phases`` limits regeneration to the given phase ids: the other
+        phases keep the quizzes and exercises of the last cached build.
+        """
+        self.pipeline.cache = self.artifacts
+        reuse_key = None
+        if phases is not None and self.artifacts:
+            pointer = self.artifacts.get(self._latest_key(character_file))
+            reuse_key = pointer["key"] if pointer else None
+        state = self.pipeline.run(
+            {
+                "character_file": Path(character_file),
+                "only_phases": phases,
+                "reuse_key": reuse_key,
+                "seed": self.seed,
+                "output_path": output_path,
+            }
+        )
+        prepare_key = self.pipeline.keys.get("prepare")
+        if self.artifacts and prepare_key:
+            self.artifacts.put(self._latest_key(character_file), {"key": prepare_key})
+        html = None
+        if output_path is None:
+            with self.timer.stage("write"):
+                html = "".join(state["html"])
+        return JourneyPage(
+            html,
+            state["page_character"],
+            state["vocabulary_keys"],
+            changed=state.get("changed", False),
+            size=state["size"] if output_path is not None else len(html.encode("utf-8")),
+            shared_files=state["shared_files"],
+        )
+
+    def _load_stage(self, character_file: Path) -> Dict[str, Any]:
+        if self.dataset is not None:
+            snapshot = self.dataset.character(character_file, self.vocabulary)
+            if snapshot is not None:
+                character, vocabulary_keys = snapshot
+                return {"character": character, "vocabulary_keys": vocabulary_keys}
+        return {"character": self.load_character(character_file)}
+
+    def _enrich_stage(self, character: Dict[str, Any]) -> Dict[str, Any]:
+        vocabulary_keys = self.vocabulary.enrich_character(character)
+        return {"character": character, "vocabulary_keys": vocabulary_keys}
+
+    def _prepare_stage(
+        self,
+        character: Dict[str, Any],
+        only_phases: Optional[Set[str]],
+        reuse_key: Optional[str],
+        seed: str,
+    ) -> Dict[str, Any]:
+        reuse = self._cached_assets(reuse_key) if reuse_key else None
+        assets = self.journey_builder.prepare(character, reuse=reuse, only_phases=only_phases, seed=seed)
+        return {"assets": assets}
+
+    @staticmethod
+    def _serialize_stage(character: Dict[str, Any], assets: JourneyAssets) -> Dict[str, Any]:
+        return {"header": PhaseSerializer(dict(character, journey_phases=assets.phases)).serialize()}
+
+    def _render_stage(
+        self,
+        character: Dict[str, Any],
+        assets: JourneyAssets,
+        header: str,
+    ) -> Dict[str, Any]:
+        page_character = dict(character, journey_phases=assets.phases)
         progress = JourneyBuilder.initial_progress(assets.phases)
         head_context = self.head_generator.build(assets.phases, progress)
-        js_bundle = LiraJSGenerator.generate(character)
-        
-        # Додаємо мнемотехніку
-        mnemo_css = self.mnemo_gen.generate_css()
-        mnemo_js = self.mnemo_gen.generate_javascript()
-        # mnemo_vocabulary генерується окремо для кожної позиції
-        # mnemo_quiz генерується окремо для кожної позиції
-        
-        # Об'єднуємо JS
-        js_bundle = js_bundle + "\n" + mnemo_js
+        # Словник з мнемотехнікою для першої фази, між театральною сценою та вправами
+        first_phase_id = assets.phases[0].get("id") if assets.phases else None
+        mnemo_vocabulary = self.mnemo_gen.generate_vocabulary_section(page_character, phase_id=first_phase_id)
         
+        # Files shared by every page (mnemonic stylesheet, runtime script
+        # bundle); the build publishes them, pages only link them
+        shared = journey_assets(self.config)
         navigation = {
-            "home_href": "../index.html",
+            "home_href": f"{self.root}index.html",
             "home_label": "На главную",
             "home_icon": "←",
             "study_label": "СПИСОК ИЗУЧЕНИЯ",
         }
         context = TemplateContext(
-            character=character,
+            character=page_character,
             phases=assets.phases,
             exercises=assets.exercises,
             quizzes=assets.quizzes,
@@ -60,101 +247,57 @@ class LiraHTMLGenerator(BaseGenerator):
             head=head_context,
             navigation=navigation,
             relations_metadata=assets.relations_metadata,
-            js_bundle=js_bundle,
+            # Inline only the character data; runtime and mnemonic JS/CSS are shared files
+            js_payload=header,
+            js_bundle=shared["journey_js"].path,
+            mnemo_vocabulary=mnemo_vocabulary,
+            mnemo_css=shared["mnemonics_css"].path,
+            root=self.root,
         )
-        
-        # Отримуємо HTML і додаємо мнемотехніку
-        html = self.template_engine.render(context)
-        
-        # НОВЕ: Вставка словника ЗВЕРХУ (після блока theatrical-scenes, перед exercises)
-        scenes_start = html.find('<div class="theatrical-scenes">')
-        insert_pos = None
-
-        if scenes_start != -1:
-            search_pos = html.find('>', scenes_start)
-            if search_pos != -1:
-                pos = search_pos + 1
-                div_count = 1
-
-                while div_count > 0 and pos < len(html):
-                    next_open = html.find('<div', pos)
-                    next_close = html.find('</div>', pos)
-
-                    if next_close == -1:
-                        break
-
-                    if next_open != -1 and next_open < next_close:
-                        div_count += 1
-                        pos = next_open + 4
-                    else:
-                        div_count -= 1
-                        if div_count == 0:
-                            insert_pos = next_close + len('</div>')
-                            break
-                        pos = next_close + len('</div>')
-
-        if insert_pos is not None:
-            # Генеруємо словник для поточної фази
-            first_phase_id = assets.phases[0].get('id') if assets.phases else None
-            vocab_html = self.mnemo_gen.generate_vocabulary_section(character, phase_id=first_phase_id)
-
-            # Вставляємо між театральною сценою та вправами
-            html = html[:insert_pos] + f'\n\n        {vocab_html}\n\n' + html[insert_pos:]
-            print(f"[DEBUG] Словник вставлено ЗВЕРХУ для {character['id']}")
-        
-        # Видаляємо placeholder-блок словника у вигляді <div class="vocabulary-section">...
-        # Залишаємо недоторканим новий варіант, що використовує <section>.
-        search_start = 0
-        placeholder_removed = False
-
-        while True:
-            block_start = html.find('<div class="vocabulary-section">', search_start)
-            if block_start == -1:
-                break
-
-            start_tag_end = html.find('>', block_start)
-            if start_tag_end == -1:
-                break
-
-            pos = start_tag_end + 1
-            depth = 1
-
-            while depth > 0 and pos < len(html):
-                next_open = html.find('<div', pos)
-                next_close = html.find('</div>', pos)
-
-                if next_close == -1:
-                    break
-
-                if next_open != -1 and next_open < next_close:
-                    depth += 1
-                    pos = next_open + 4
-                else:
-                    depth -= 1
-                    pos = next_close + len('</div>')
-
-            if depth != 0:
-                # Не вдалося знайти коректне закриття блоку, припиняємо пошук.
-                break
-
-            block_end = pos
-            block_content = html[block_start:block_end]
-
-            if '<div class="vocabulary-grid"></div>' in block_content:
-                html = html[:block_start] + html[block_end:]
-                placeholder_removed = True
-                search_start = block_start
-            else:
-                search_start = block_end
-
-        if placeholder_removed:
-            print(f"[DEBUG] Видалено placeholder vocabulary-section для {character['id']}")
-        
-        # Вставляємо CSS мнемотехніки в head
-        # Додаємо CSS стилі в head через style тег
-        if mnemo_css and '</head>' in html:
-            style_block = f'<style>\n{mnemo_css}\n</style>'
-            html = html.replace('</head>', f'{style_block}\n</head>')
-            print(f"[DEBUG] CSS мнемотехніки додано в head для {character['id']}")
-        
-        return html
+        html = self.timer.iterate("render", self.template_engine.stream(context))
+        return {
+            "html": html,
+            "page_character": page_character,
+            "shared_files": [shared["mnemonics_css"].path, shared["journey_js"].path],
+        }
+
+    def _postprocess_stage(
+        self,
+        html: Iterable[str],
+        page_character: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        rewriter = self._page_rewriter(page_character)
+        return {"html": self.timer.iterate("postprocess", rewriter.rewrite(html))}
+
+    @staticmethod
+    def _optimize_stage(html: Iterable[str]) -> Dict[str, Any]:
+        # Blank lines are dropped across chunk borders: the page is joined here
+        return {"html": [compact_html("".join(html))]}
+
+    def _write_stage(self, html: Iterable[str], output_path: Path) -> Dict[str, Any]:
+        # With PRECOMPRESS_HTML the .gz is written in the same pass (mtime 0, so
+        # identical pages give identical bytes)
+        gz_path = Path(output_path).with_name(Path(output_path).name + ".gz") if self.precompress else None
+        changed, size = self.save_stream(html, output_path, gzip_path=gz_path)
+        return {"changed": changed, "size": size}
+
+    @staticmethod
+    def _latest_key(character_file: Path) -> str:
+        """Cache key of the pointer to a character's most recent prepared assets."""
+        # Keyed on the path: character ids may repeat across books.
+        source = Path(character_file).resolve()
+        return hashlib.sha256(f"latest:{source}".encode("utf-8")).hexdigest()
+
+    def _cached_assets(self, key: str) -> Optional[JourneyAssets]:
+        data = self.artifacts.get(key) if self.artifacts else None
+        if not data:
+            return None
+        return self.pipeline.get("prepare").restore(data)["assets"]
+
+    def _page_rewriter(self, character: Dict[str, Any]) -> HTMLRewriter:
+        """Edits applied to a rendered page in the single postprocess pass.
+
+        None by default: everything the page needs is rendered by the
+        template. A rewriter without rules passes the stream through.
+        """
+        return HTMLRewriter()
@@ -2,49 +2,61 @@
 
 from .base import BaseGenerator
 
+ROLE_DESCRIPTIONS = {
+    "king_lear": "Трагический король",
+    "cordelia": "Верная дочь",
+    "goneril": "Старшая дочь-предательница",
+    "regan": "Младшая дочь-предательница",
+    "gloucester": "Благородный граф",
+    "edgar": "Законный сын Глостера",
+    "edmund": "Бастард Глостера",
+    "kent": "Верный советник",
+    "fool": "Мудрый шут",
+    "albany": "Муж Гонерильи",
+    "cornwall": "Муж Реганы",
+    "oswald": "Управляющий Гонерильи",
+}
+
 
 class IndexGenerator(BaseGenerator):
     """Generate index page with all character journeys"""
 
-    def generate(self, character_files):
-        """Generate index page with character grid"""
-        role_descriptions = {
-            "king_lear": "Трагический король",
-            "cordelia": "Верная дочь",
-            "goneril": "Старшая дочь-предательница",
-            "regan": "Младшая дочь-предательница",
-            "gloucester": "Благородный граф",
-            "edgar": "Законный сын Глостера",
-            "edmund": "Бастард Глостера",
-            "kent": "Верный советник",
-            "fool": "Мудрый шут",
-            "albany": "Муж Гонерильи",
-            "cornwall": "Муж Реганы",
-            "oswald": "Управляющий Гонерильи",
-        }
-
-        cards = []
+    @staticmethod
+    def card(char_id, character, prefix=""):
+        """Small summary of a character used for its index card
 
-        for char_file in character_files:
-            character = self.load_character(char_file)
-            char_id = char_file.stem
-            journey_phases = character.get("journey_phases", [])
+        ``prefix`` is the book's location under output/ ("" for the default book).
+        """
+        journey_phases = character.get("journey_phases", [])
 
-            first_icon = journey_phases[0]["icon"] if journey_phases else "👤"
-            role = role_descriptions.get(char_id, character.get("title", "Персонаж"))
+        first_icon = journey_phases[0]["icon"] if journey_phases else "👤"
+        role = ROLE_DESCRIPTIONS.get(char_id, character.get("title", "Персонаж"))
 
-            cards.append(
-                {
-                    "id": char_id,
-                    "icon": first_icon,
-                    "name": character["name"],
-                    "role": role,
-                    "phase_count": len(journey_phases),
-                    "url": f"journeys/{char_file.stem}.html",
-                }
-            )
+        return {
+            "id": char_id,
+            "icon": first_icon,
+            "name": character["name"],
+            "role": role,
+            "phase_count": len(journey_phases),
+            "url": f"{prefix}journeys/{char_id}.html",
+        }
 
+    def generate(self, character_files):
+        """Generate index page with character grid"""
+        cards = [
+            self.card(char_file.stem, self.load_character(char_file))
+            for char_file in character_files
+        ]
+        return self.render(cards)
+
+    def render(self, cards, books=None):
+        """Render the index page from precomputed cards
+
+        ``books`` is a list of ``{"id", "title", "cards"}`` sections; when it
+        has more than one entry every book gets its own titled grid.
+        """
         return self.render_template(
             "index.html",
             cards=cards,
+            books=books if books and len(books) > 1 else None,
         )
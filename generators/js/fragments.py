@@ -4,9 +4,18 @@ from __future__ import annotations
 from functools import lru_cache
 from pathlib import Path
 
+RUNTIME_PATH = Path(__file__).resolve().parents[2] / "static" / "js" / "journey_runtime.js"
+
 
 @lru_cache(maxsize=1)
+def _read_runtime(signature: tuple) -> str:
+    return RUNTIME_PATH.read_text(encoding="utf-8")
+
+
 def load_runtime() -> str:
-    """Return the static runtime script for journey interactions."""
-    runtime_path = Path(__file__).resolve().parents[2] / "static" / "js" / "journey_runtime.js"
-    return runtime_path.read_text(encoding="utf-8")
+    """Return the static runtime script for journey interactions.
+
+    Cached per file mtime/size so long-lived build processes see edits.
+    """
+    stat = RUNTIME_PATH.stat()
+    return _read_runtime((stat.st_mtime_ns, stat.st_size))
@@ -6,14 +6,33 @@ from typing import Any, Dict
 from .fragments import load_runtime
 from .serializer import PhaseSerializer
 
+# Declarations every page shares; they open the runtime bundle
+RUNTIME_PRELUDE = (
+    "const STORAGE_PREFIX = 'liraJourney';\n"
+    "const REVIEW_QUEUE_KEY = `${STORAGE_PREFIX}:reviewQueue`;\n"
+    "const quizStateCache = {};\n\n"
+)
+
 
 class JavaScriptGenerator:
-    """Combine serialized data with the runtime script."""
+    """Combine serialized data with the runtime script.
+
+    A page inlines only the serialized data (``PhaseSerializer``); the
+    ``shared`` part is the same for every page and is served as one file.
+    Both are classic scripts, so the data's top-level ``const``s are
+    visible to the runtime that follows.
+    """
 
     def __init__(self, runtime_loader=load_runtime) -> None:
         self.runtime_loader = runtime_loader
 
     def generate(self, character: Dict[str, Any]) -> str:
-        header = PhaseSerializer(character).serialize()
-        runtime = self.runtime_loader()
-        return f"{header}{runtime}"
+        return self.bundle(PhaseSerializer(character).serialize())
+
+    def bundle(self, header: str) -> str:
+        """Append the shared runtime to an already serialized data header."""
+        return f"{header}{self.shared()}"
+
+    def shared(self) -> str:
+        """The page-independent part: shared declarations and the runtime."""
+        return f"{RUNTIME_PRELUDE}{self.runtime_loader()}"
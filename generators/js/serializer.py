@@ -24,15 +24,11 @@ class PhaseSerializer:
     def serialize(self) -> str:
         phase_map = self._build_phase_map()
         character_id = self.character.get("id") or self.character.get("slug") or "journey"
+        # Only the character's data: everything shared is in the runtime bundle
         parts = [
             "const phaseVocabularies = ",
             f"{json.dumps(phase_map, ensure_ascii=False, indent=4)};\n\n",
             f"const characterId = {json.dumps(character_id)};\n",
-            "const STORAGE_PREFIX = 'liraJourney';\n",
-            "const REVIEW_QUEUE_KEY = `${STORAGE_PREFIX}:reviewQueue`;\n",
-            "const quizStateCache = {};\n\n",
-            "window.phaseData = phaseVocabularies;\n",
-            "window.phaseKeys = Object.keys(phaseVocabularies);\n\n",
         ]
         return "".join(parts)
 
@@ -12,3 +12,7 @@ class LiraJSGenerator:
     @staticmethod
     def generate(character_data: Dict[str, Any]) -> str:
         return JavaScriptGenerator().generate(character_data)
+
+    @staticmethod
+    def bundle(header: str) -> str:
+        return JavaScriptGenerator().bundle(header)
@@ -4,118 +4,338 @@ King Lear Comic Generator - Main Entry Point
 Supports 12 characters with unique journeys
 """
 
+import argparse
 import json
+import os
 import sys
-import shutil
 from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 import config
-from generators import IndexGenerator, LiraHTMLGenerator
 
-def main():
-    """Main generator function"""
-    print("=" * 60)
-    print("  KING LEAR COMIC GENERATOR - 12 CHARACTERS")
-    print("=" * 60)
+# The build stack (generators.build.site and what it pulls in) is imported
+# in the branches that run a build, so --send, --rollback and argument
+# errors start quickly (see scripts/check_import_budget.py).
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="King Lear comic website generator")
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes for journey pages (default: CPU count)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="ignore the build manifest and regenerate every output",
+    )
+    parser.add_argument(
+        "--book",
+        metavar="IDS",
+        help="build only these books (comma separated); other books keep their published pages",
+    )
+    parser.add_argument(
+        "--only",
+        metavar="IDS",
+        help="rebuild only these characters (comma separated, e.g. king_lear,kent) and the index",
+    )
+    parser.add_argument(
+        "--phase",
+        metavar="CHARACTER:PHASE",
+        action="append",
+        default=[],
+        help="regenerate one phase of a character (repeatable); other phases reuse the last build",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="rebuild only the pages that failed last time (see .cache/build-errors.json) and the index",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="build only every N-th page starting at I into output.shards/I-of-N (no index, no assets)",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="publish the pages of all shards in output.shards/ with the index and static assets",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="do not read or write the artifact cache in .cache/artifacts",
+    )
+    parser.add_argument(
+        "--seed",
+        default=None,
+        help="quiz shuffling seed (default: BUILD_SEED in config.py); a new seed rebuilds every page",
+    )
+    parser.add_argument(
+        "--no-stage",
+        action="store_true",
+        help="write straight into output/ instead of staging and swapping",
+    )
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="swap the previous build back into output/ and exit",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time every build stage per character and print a sorted table",
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=Path,
+        default=config.CACHE_DIR / "build-profile.json",
+        help="where --profile writes its JSON report (default: .cache/build-profile.json)",
+    )
+    parser.add_argument(
+        "--ci", "--quiet",
+        dest="ci",
+        action="store_true",
+        help="headless build: no browser, no progress output, one JSON summary on stdout; "
+        "exit code 0 = all built, 2 = partial failure, 1 = nothing built",
+    )
+    parser.add_argument(
+        "--changed-files",
+        type=Path,
+        metavar="PATH",
+        help="write the output files this build changed (one per line, relative to output/) "
+        "for a targeted CDN purge or rsync",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="after the build, poll data/, templates/ and static/ and rebuild what changed",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.3,
+        metavar="SECONDS",
+        help="--watch waits this long without new changes before rebuilding (default: 0.3)",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="stay resident with warm generators and serve rebuild requests on --socket",
+    )
+    parser.add_argument(
+        "--send",
+        metavar="COMMAND",
+        help='send a request to a running daemon: "all", "character king_lear", "index", "stop"',
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=config.CACHE_DIR / "build.sock",
+        help="Unix socket used by --daemon and --send (default: .cache/build.sock)",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_targets(args):
+    """Validate --book, --only and --phase; return (books, characters, phases) for BuildOptions"""
+    from generators.build import character_ids, discover_books
+    books = discover_books(config)
+    book_ids = None
+    if args.book:
+        book_ids = [name for name in args.book.replace(",", " ").split() if name]
+        unknown = sorted(set(book_ids) - {book.id for book in books})
+        if unknown:
+            raise ValueError(f"unknown book(s): {', '.join(unknown)}")
+    characters = None
+    if args.only:
+        characters = [name for name in args.only.replace(",", " ").split() if name]
+    phases = {}
+    for spec in args.phase:
+        char_id, _, phase_id = spec.partition(":")
+        if not char_id or not phase_id:
+            raise ValueError(f"--phase expects CHARACTER:PHASE, got {spec!r}")
+        phases.setdefault(char_id, set()).add(phase_id)
+    unknown = sorted((set(characters or ()) | set(phases)) - set(character_ids(books)))
+    if unknown:
+        raise ValueError(f"unknown character(s): {', '.join(unknown)}")
+    return book_ids, characters, phases or None
+
+
+def build_options(args):
+    """Translate command line arguments into BuildOptions"""
+    books, characters, phases = parse_targets(args)
+    if args.shard and args.merge:
+        raise ValueError("--shard and --merge are separate steps")
+    if args.watch and args.ci:
+        raise ValueError("--watch keeps running; it cannot be combined with --ci")
+    from generators.build import BuildOptions, parse_shard
+    return BuildOptions(
+        jobs=max(1, args.jobs),
+        force=args.force,
+        use_cache=not args.no_cache,
+        stage=not args.no_stage,
+        verbose=not args.ci,
+        characters=characters,
+        phases=phases,
+        books=books,
+        seed=args.seed,
+        shard=parse_shard(args.shard) if args.shard else None,
+        retry_failed=args.retry_failed,
+    )
+
+
+def print_error(args, message):
+    """Report a failure before any build ran; under --ci as the JSON summary"""
+    if args.ci:
+        print(json.dumps({"status": "failed", "error": message, "exit_code": 1}, ensure_ascii=False, indent=2))
+    else:
+        print(f"[ERROR] {message}")
+    return 1
+
+
+def print_summary(report, say):
+    """Print the human readable build summary"""
+    say("\n" + "=" * 60)
+    say(f"[SUMMARY]")
+    total = len(report.character_files) + len(report.missing)
+    say(f"  - Characters found: {len(report.character_files)}/{total}")
+    say(f"  - Pages generated: {report.generated}")
+    say(f"  - Pages skipped (unchanged): {report.skipped}")
+    say(f"  - Output files changed: {len(report.changed_files)}")
+    say(f"  - Page build time: {sum(result.seconds for result in report.results):.2f}s")
+    if report.peak_rss:
+        workers = f" (workers {report.worker_peak_rss / 2**20:.1f} MB)" if report.worker_peak_rss else ""
+        say(f"  - Peak memory: {report.peak_rss / 2**20:.1f} MB{workers}")
+    say(f"  - Output location: {report.output_dir}")
     
-    # Create output directories
-    config.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    (config.OUTPUT_DIR / "journeys").mkdir(exist_ok=True)
-
-    # Copy static assets for browser caching
-    static_src = config.BASE_DIR / "static"
-    if static_src.exists():
-        shutil.copytree(static_src, config.OUTPUT_DIR / "static", dirs_exist_ok=True)
+    if report.ready == total:
+        say(f"  - Status: [OK] ALL CHARACTERS READY!")
+    elif report.ready > 0:
+        say(f"  - Status: [WARNING] PARTIAL SUCCESS")
+    else:
+        say(f"  - Status: [ERROR] GENERATION FAILED")
+    if report.publish_error:
+        say(f"  - Publish: [ERROR] {report.publish_error}")
     
-    # Copy training.html from templates to output
-    training_src = config.BASE_DIR / "templates" / "training.html"
-    if training_src.exists():
-        shutil.copy2(training_src, config.OUTPUT_DIR / "training.html")
-        print("[OK] Copied training.html to output")
+    if report.failures:
+        say(f"\n[ERRORS] {len(report.failures)} page(s) failed:")
+        for result in report.failures:
+            say(f"  - {result.name}: {result.error}")
+            say("    " + result.traceback.strip().replace("\n", "\n    "))
     
-    # Initialize generators
-    lira_gen = LiraHTMLGenerator(config)
-    index_gen = IndexGenerator(config)
+    say("=" * 60)
+
+
+def main(argv=None):
+    """Main generator function"""
+    args = parse_args(argv)
+    # --ci keeps stdout free for the JSON summary
+    say = (lambda *_: None) if args.ci else print
     
-    # Get character files in specified order
-    character_files = []
-    missing_characters = []
+    if args.send:
+        from generators.build import send_command
+        try:
+            reply = send_command(args.socket, args.send)
+        except OSError as e:
+            print(f"[ERROR] Build daemon not reachable at {args.socket}: {e}")
+            return 1
+        print(json.dumps(reply, ensure_ascii=False, indent=2))
+        return reply.get("exit_code", 0 if reply.get("status") == "ok" else 1)
     
-    for char_name in config.CHARACTER_ORDER:
-        char_file = config.CHARACTERS_DIR / f"{char_name}.json"
-        if char_file.exists():
-            character_files.append(char_file)
-            print(f"[FOUND] {char_name}.json [OK]")
-        else:
-            missing_characters.append(char_name)
-            print(f"[MISSING] {char_name}.json [X]")
+    if args.daemon:
+        from generators.build import BuildDaemon
+        try:
+            options = build_options(args)
+        except ValueError as e:
+            return print_error(args, str(e))
+        daemon = BuildDaemon(config, args.socket, options)
+        try:
+            daemon.serve_forever()
+        except OSError as e:
+            print(f"[ERROR] Build daemon failed to start: {e}")
+            return 1
+        except KeyboardInterrupt:
+            print("\n[OK] Build daemon stopped")
+        return 0
     
-    if missing_characters:
-        print(f"\n[WARNING] Missing {len(missing_characters)} character files:")
-        for char in missing_characters:
-            print(f"  - {char}.json")
+    if args.rollback:
+        from generators.build import StagedOutput
+        staged = StagedOutput(config.OUTPUT_DIR)
+        if staged.rollback():
+            print(f"[OK] Restored previous build into {config.OUTPUT_DIR}")
+            return 0
+        print(f"[ERROR] No previous build found at {staged.previous}")
+        return 1
     
-    print(f"\n[INFO] Processing {len(character_files)} characters...")
+    try:
+        options = build_options(args)
+    except ValueError as e:
+        return print_error(args, str(e))
     
-    # Generate journey pages for each character
-    generated_count = 0
-    for char_file in character_files:
-        try:
-            print(f"\n[GENERATING] {char_file.stem}...")
-            
-            # Generate journey page
-            html = lira_gen.generate_journey(char_file)
-            
-            # Save to output
-            output_path = config.OUTPUT_DIR / "journeys" / f"{char_file.stem}.html"
-            lira_gen.save_file(html, output_path)
-            
-            print(f"[OK] Saved: {output_path.name}")
-            generated_count += 1
-            
-        except Exception as e:
-            print(f"[ERROR] Failed to generate {char_file.stem}: {e}")
+    say("=" * 60)
+    say("  KING LEAR COMIC GENERATOR - 12 CHARACTERS")
+    say("=" * 60)
     
-    # Generate index page
-    if character_files:
-        print("\n[GENERATING] Index page...")
+    from generators.build import SiteBuilder
+    builder = SiteBuilder(config, printer=say)
+    if args.merge:
         try:
-            index_html = index_gen.generate(character_files)
-            index_gen.save_file(index_html, config.OUTPUT_DIR / "index.html")
-            print("[OK] Index page created")
-        except Exception as e:
-            print(f"[ERROR] Failed to generate index: {e}")
+            report = builder.merge(options)
+        except ValueError as e:
+            return print_error(args, str(e))
+    else:
+        report = builder.build(options)
+    print_summary(report, say)
     
-    # Summary
-    print("\n" + "=" * 60)
-    print(f"[SUMMARY]")
-    print(f"  - Characters found: {len(character_files)}/12")
-    print(f"  - Pages generated: {generated_count}")
-    print(f"  - Output location: {config.OUTPUT_DIR}")
+    if args.changed_files:
+        from utils.file_operations import write_text
+        write_text(args.changed_files, "".join(f"{name}\n" for name in report.changed_files))
+        say(f"[OK] Changed files list: {args.changed_files}")
     
-    if generated_count == 12:
-        print(f"  - Status: [OK] ALL CHARACTERS READY!")
-    elif generated_count > 0:
-        print(f"  - Status: [WARNING] PARTIAL SUCCESS")
-    else:
-        print(f"  - Status: [ERROR] GENERATION FAILED")
+    profile_path = None
+    if args.profile:
+        from generators.build import BuildProfile
+        profile = BuildProfile()
+        profile.add_pages(report.results)
+        profile.add_site(report.timings)
+        say("\n[PROFILE]")
+        for line in profile.table():
+            say(f"  {line}")
+        profile_path = profile.save(args.profile_output)
+        say(f"[OK] Profile saved: {profile_path}")
     
-    print("=" * 60)
+    if args.ci:
+        summary = report.to_summary()
+        summary["profile"] = str(profile_path) if profile_path else None
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return report.exit_code
     
-    # Try to open in browser
-    if generated_count > 0:
+    # Try to open in browser (a shard has no index page)
+    if report.ready > 0 and not options.shard:
         try:
             import webbrowser
             index_path = config.OUTPUT_DIR / "index.html"
             webbrowser.open(f"file:///{index_path.absolute()}")
-            print("\n[OK] Opening in browser...")
+            say("\n[OK] Opening in browser...")
         except:
-            print("\n[INFO] Please open manually: output/index.html")
+            say("\n[INFO] Please open manually: output/index.html")
+    
+    if args.watch:
+        from generators.build import Watcher
+        watcher = Watcher(config, options, debounce=args.debounce)
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            print("\n[OK] Watch stopped")
+        return 0
     
-    return 0 if generated_count > 0 else 1
+    return 0 if report.ready > 0 and not report.publish_error else 1
 
 if __name__ == "__main__":
     sys.exit(main())
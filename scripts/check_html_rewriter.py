@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+"""Behaviour checks for utils.html_rewriter.HTMLRewriter.
+
+Every case is rewritten from one chunk, from every two-chunk split and
+from one-character chunks; all of them must give the expected document.
+Published journey pages (output/journeys) are also run through rules
+that match nothing and must come out byte for byte.
+
+    python scripts/check_html_rewriter.py
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.html_rewriter import HTMLRewriter  # noqa: E402
+
+PAGE = (
+    "<!DOCTYPE html>\n"
+    "<html lang=\"ru\">\n"
+    "<head>\n"
+    "  <meta charset=\"UTF-8\">\n"
+    "  <title>Lear &amp; Kent &#8212; test</title>\n"
+    "</head>\n"
+    "<body>\n"
+    "  <!-- header -->\n"
+    "  <div class=\"vocabulary-section\" data-note=\"a > b\">\n"
+    "    <p>Der König<br/>spricht</p>\n"
+    "  </div>\n"
+    "  <div class=\"vocabulary-section extra\"><p>Die Tochter</p></div>\n"
+    "  <section class=\"hints\">  <!-- nothing yet -->\n  </section>\n"
+    "  <section class=\"hints\"><span>Tipp</span></section>\n"
+    "  <script>if (a < b) { document.write(\"</p>\"); }</script>\n"
+    "</body>\n"
+    "</html>\n"
+)
+
+
+def _replace(text, old, new):
+    """``text`` with ``old`` (which must occur exactly once) replaced by ``new``."""
+    if text.count(old) != 1:
+        raise ValueError(f"fixture must contain {old!r} exactly once")
+    return text.replace(old, new)
+
+
+def splits(text):
+    """Every way the checks feed ``text``: whole, in two at each index, per character."""
+    yield "1 chunk", [text]
+    for index in range(1, len(text)):
+        yield f"split at {index}", [text[:index], text[index:]]
+    yield "1-char chunks", list(text)
+
+
+def check(name, rewriter, source, expected):
+    """Rewrite ``source`` under every chunking; return the number of mismatches."""
+    for how, chunks in splits(source):
+        result = "".join(rewriter.rewrite(chunks))
+        if result != expected:
+            at = next(
+                (i for i, (a, b) in enumerate(zip(result, expected)) if a != b),
+                min(len(result), len(expected)),
+            )
+            print(f"[FAIL] {name} ({how}): differs at {at}: {result[at - 20:at + 40]!r}")
+            return 1
+    print(f"[OK] {name}")
+    return 0
+
+
+def cases():
+    """(name, rewriter, source, expected) for every behaviour under check."""
+    yield "no rules: passthrough", HTMLRewriter(), PAGE, PAGE
+    yield (
+        "no matches: passthrough",
+        HTMLRewriter()
+        .insert_after("div.missing", "<hr>")
+        .append("#nowhere", "x")
+        .remove_if_empty("aside"),
+        PAGE,
+        PAGE,
+    )
+    yield (
+        "append_to_head",
+        HTMLRewriter().append_to_head("<style>b{}</style>\n"),
+        PAGE,
+        _replace(PAGE, "</head>", "<style>b{}</style>\n</head>"),
+    )
+    yield (
+        "append to every match",
+        HTMLRewriter().append("div.vocabulary-section", "<i>+</i>"),
+        PAGE,
+        _replace(
+            _replace(PAGE, "spricht</p>\n  </div>", "spricht</p>\n  <i>+</i></div>"),
+            "Die Tochter</p></div>",
+            "Die Tochter</p><i>+</i></div>",
+        ),
+    )
+    yield (
+        "insert_after every match",
+        HTMLRewriter().insert_after("div.vocabulary-section", "<hr>"),
+        PAGE,
+        _replace(
+            _replace(PAGE, "spricht</p>\n  </div>", "spricht</p>\n  </div><hr>"),
+            "Die Tochter</p></div>",
+            "Die Tochter</p></div><hr>",
+        ),
+    )
+    yield (
+        "insert_after a void element",
+        HTMLRewriter().insert_after("br", "|"),
+        PAGE,
+        _replace(PAGE, "<br/>", "<br/>|"),
+    )
+    yield (
+        "insert_after once",
+        HTMLRewriter().insert_after("div.vocabulary-section", "<hr>", once=True),
+        PAGE,
+        _replace(PAGE, "spricht</p>\n  </div>", "spricht</p>\n  </div><hr>"),
+    )
+    yield (
+        "append once, then copy the rest",
+        HTMLRewriter().append("p", "!", once=True),
+        PAGE,
+        _replace(PAGE, "spricht</p>", "spricht!</p>"),
+    )
+    yield (
+        "compound selector",
+        HTMLRewriter().append("div.vocabulary-section.extra", "*"),
+        PAGE,
+        _replace(PAGE, "Die Tochter</p></div>", "Die Tochter</p>*</div>"),
+    )
+    yield (
+        "remove_if_empty",
+        HTMLRewriter().remove_if_empty("section.hints"),
+        PAGE,
+        _replace(PAGE, "<section class=\"hints\">  <!-- nothing yet -->\n  </section>", ""),
+    )
+    yield (
+        "remove_if_empty keeps entities",
+        HTMLRewriter().remove_if_empty("title"),
+        PAGE,
+        PAGE,
+    )
+    yield (
+        "remove_if_empty once",
+        HTMLRewriter().remove_if_empty("section", once=True),
+        PAGE,
+        _replace(PAGE, "<section class=\"hints\">  <!-- nothing yet -->\n  </section>", ""),
+    )
+    yield (
+        # No implicit end tags: both items are open until </ul>
+        "elements left open end with their parent",
+        HTMLRewriter().append("li", "."),
+        "<ul><li>eins<li>zwei</ul>\n",
+        "<ul><li>eins<li>zwei..</ul>\n",
+    )
+    yield (
+        "rules combined",
+        HTMLRewriter()
+        .append_to_head("<link rel=\"stylesheet\" href=\"x.css\">")
+        .insert_after("div.vocabulary-section", "<hr>", once=True)
+        .remove_if_empty("section.hints"),
+        PAGE,
+        _replace(
+            _replace(
+                _replace(PAGE, "</head>", "<link rel=\"stylesheet\" href=\"x.css\"></head>"),
+                "spricht</p>\n  </div>",
+                "spricht</p>\n  </div><hr>",
+            ),
+            "<section class=\"hints\">  <!-- nothing yet -->\n  </section>",
+            "",
+        ),
+    )
+
+
+def check_pages():
+    """Published pages must pass through rules that match nothing unchanged."""
+    pages = sorted((PROJECT_ROOT / "output" / "journeys").glob("*.html"))
+    if not pages:
+        print("[INFO] No pages in output/journeys; run main.py to check them too")
+        return 0
+    rewriter = HTMLRewriter().insert_after("div.no-such-class", "<hr>").remove_if_empty("#nowhere")
+    failed = 0
+    for page in pages:
+        html = page.read_text(encoding="utf-8")
+        # Page-sized blocks and a ragged split that cuts through tags
+        for size in (4096, 997):
+            chunks = [html[i:i + size] for i in range(0, len(html), size)]
+            if "".join(rewriter.rewrite(chunks)) != html:
+                print(f"[FAIL] {page.name}: changed by rules that match nothing ({size}-char chunks)")
+                failed += 1
+                break
+    if not failed:
+        print(f"[OK] {len(pages)} published pages pass through unchanged")
+    return failed
+
+
+def main():
+    failed = 0
+    for name, rewriter, source, expected in cases():
+        failed += check(name, rewriter, source, expected)
+    failed += check_pages()
+    if failed:
+        print(f"\n[ERROR] {failed} check(s) failed")
+        return 1
+    print("\n[OK] All rewriter checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Import-time budget: fail when an entry point gets slower to import.
+
+Every module is imported in a fresh interpreter with ``-X importtime``;
+the best of several runs is compared with its budget (milliseconds).
+Budgets were set on a machine where REFERENCE took its listed time; on
+a slower machine they grow by the same factor.
+
+    python scripts/check_import_budget.py            # check, exit 1 if over
+    python scripts/check_import_budget.py --runs 10  # steadier numbers
+    python scripts/check_import_budget.py --show utils
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import time per entry point, in milliseconds (about 2x the
+# measured value, so only real regressions trip it)
+BUDGETS = {
+    # Package roots are lazy: importing them loads nothing heavy
+    "utils": 40,
+    "generators": 40,
+    "generators.build": 40,
+    # CLI start-up (--send, --rollback, argument errors) without the build stack
+    "main": 60,
+    # A single-page rebuild needs the journey generator and Jinja
+    "generators.html_lira": 230,
+}
+
+# Stdlib import timed on every run, and its time (ms) where BUDGETS were set
+REFERENCE = ("argparse", 15.0)
+
+
+def import_time(module, runs):
+    """Best cumulative import time of ``module`` in milliseconds."""
+    best = None
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            cwd=PROJECT_ROOT,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()}")
+        micros = None
+        for line in result.stderr.splitlines():
+            # "import time: self [us] | cumulative | imported package"
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].rstrip() == f" {module}":
+                micros = int(parts[1])
+        if micros is None:
+            raise RuntimeError(f"no importtime line for {module}")
+        best = micros if best is None else min(best, micros)
+    return best / 1000
+
+
+def show(module):
+    """Print the slowest imports below ``module``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    for micros, name in sorted(rows, reverse=True)[:20]:
+        print(f"{micros / 1000:8.1f} ms {name}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="imports per module; the fastest counts")
+    parser.add_argument("--show", metavar="MODULE", help="list the slowest imports of MODULE and exit")
+    args = parser.parse_args(argv)
+
+    if args.show:
+        show(args.show)
+        return 0
+
+    try:
+        reference = import_time(REFERENCE[0], max(1, args.runs))
+    except RuntimeError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    # Never tighter than the listed budgets, only looser on slow machines
+    scale = max(1.0, reference / REFERENCE[1])
+    print(f"[INFO] {REFERENCE[0]} imports in {reference:.1f} ms; budgets x{scale:.2f}")
+
+    failed = 0
+    for module, budget in BUDGETS.items():
+        budget = round(budget * scale)
+        try:
+            elapsed = import_time(module, max(1, args.runs))
+        except RuntimeError as e:
+            print(f"[ERROR] {e}")
+            failed += 1
+            continue
+        status = "OK" if elapsed <= budget else "FAIL"
+        failed += status == "FAIL"
+        print(f"[{status}] {module:<24} {elapsed:7.1f} ms (budget {budget} ms)")
+
+    if failed:
+        print(f"\n[ERROR] {failed} module(s) over budget; see --show MODULE")
+        return 1
+    print("\n[OK] All imports within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,21 @@
 Фінальна валідація виправлень мнемотехніки
 """
 from pathlib import Path
+import re
+
+# Спільні файли мнемотехніки, які підключає кожна сторінка
+MNEMONICS_CSS = r'mnemonics\.[0-9a-f]+\.css'
+JOURNEY_JS = r'journey\.[0-9a-f]+\.js'
+
+
+def linked_asset(html_file, content, pattern):
+    """Позиція посилання на файл pattern у сторінці та його текст (None, '' якщо немає)"""
+    match = re.search(r'(?:href|src)="([^"]*%s)"' % pattern, content)
+    if not match:
+        return None, ''
+    asset = html_file.parent / match.group(1)
+    return match.start(), asset.read_text(encoding='utf-8') if asset.exists() else ''
+
 
 def validate():
     html_file = Path(__file__).parent.parent / "output" / "journeys" / "king_lear.html"
@@ -13,19 +28,22 @@ def validate():
 
     with open(html_file, 'r', encoding='utf-8') as f:
         html = f.read()
+    css_pos, css = linked_asset(html_file, html, MNEMONICS_CSS)
+    js_pos, js = linked_asset(html_file, html, JOURNEY_JS)
 
     print("[ВАЛІДАЦІЯ] Результати виправлення:")
     print("=" * 60)
 
     checks = {
-        "CSS мнемотехніки в HEAD": '.vocab-card' in html and '.articles-quiz' in html,
-        "JavaScript для артиклів": 'initArticlesQuiz' in html,
-        "Кольорові класи (der)": 'is-der' in html or 'color-der' in html,
-        "Кольорові класи (die)": 'is-die' in html or 'color-die' in html, 
-        "Кольорові класи (das)": 'is-das' in html or 'color-das' in html,
+        "CSS мнемотехніки в HEAD": (css_pos is not None and css_pos < html.find('</head>')
+                                    and '.vocab-card' in css and '.articles-quiz' in css),
+        "JavaScript для артиклів": js_pos is not None and 'initArticlesQuiz' in js,
+        "Кольорові класи (der)": 'is-der' in css or 'color-der' in css,
+        "Кольорові класи (die)": 'is-die' in css or 'color-die' in css,
+        "Кольорові класи (das)": 'is-das' in css or 'color-das' in css,
         "Існує vocabulary-grid": 'vocabulary-grid' in html,
-        "Словник з мнемотехнікою": 'vocab-card' in html,
-        "Вправа на артиклі": 'articles-quiz' in html or 'articles-exercise' in html,
+        "Словник з мнемотехнікою": 'vocab-card' in html + css,
+        "Вправа на артиклі": 'articles-quiz' in html + css or 'articles-exercise' in html,
         "Російська мова інтерфейсу": 'Выберите правильный артикль' in html or 'Артикли и род' in html,
         "Легенда артиклів": 'чоловічий' in html or 'мужской' in html,
         "НЕ українська в інтерфейсі": 'Виберіть правильний артикль' not in html
@@ -7,6 +7,7 @@ import json
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from generators.generated_assets import journey_assets
 from generators.html_lira import LiraHTMLGenerator
 import config
 
@@ -23,11 +24,17 @@ print("[START] Генерація тестової сторінки...")
 # Генеруємо HTML
 html = html_gen.generate_journey(test_file)
 
+# Спільні файли, які сторінка підключає замість вбудованих стилів і скриптів
+assets = journey_assets(config)
+css = assets['mnemonics_css'].content
+css_link_pos = html.find(assets['mnemonics_css'].path)
+js = assets['journey_js'].content
+
 # КРИТИЧНІ ПЕРЕВІРКИ
 checks = []
 
 # 1. Перевірка CSS
-has_css_vars = '--der-primary' in html and '--die-primary' in html and '--das-primary' in html
+has_css_vars = '--der-primary' in css and '--die-primary' in css and '--das-primary' in css
 checks.append(('CSS змінні артиклів', has_css_vars))
 
 # 2. Перевірка HTML структур
@@ -37,17 +44,17 @@ checks.append(('Легенда артиклів', has_legend))
 has_vocab_grid = 'vocabulary-grid' in html
 checks.append(('Сітка словника', has_vocab_grid))
 
-has_quiz = 'articles-quiz' in html
+has_quiz = 'articles-quiz' in html + css
 checks.append(('Вправа на артиклі', has_quiz))
 
-has_quiz_items = 'quiz-item' in html
+has_quiz_items = 'quiz-item' in html + css
 checks.append(('Питання вправи', has_quiz_items))
 
-has_vocab_cards = 'vocab-card' in html
+has_vocab_cards = 'vocab-card' in html + css
 checks.append(('Картки словника', has_vocab_cards))
 
 # 3. Перевірка JavaScript
-has_js_init = 'initArticlesQuiz' in html
+has_js_init = assets['journey_js'].path in html and 'initArticlesQuiz' in js
 checks.append(('JS ініціалізація', has_js_init))
 
 # 4. Перевірка позиціонування (мнемотехніка після вправ)
@@ -62,13 +69,8 @@ correct_order = (exercises_pos > 0 and vocab_pos > exercises_pos and
                 nav_pos > vocab_pos and nav_pos > quiz_pos)
 checks.append(('Правильний порядок секцій', correct_order))
 
-# 5. Перевірка наявності style тегу в head
-has_style_in_head = '<style>' in html and '</style>' in html and '</head>' in html
-style_before_head_close = False
-if has_style_in_head:
-    style_pos = html.find('<style>')
-    head_close_pos = html.find('</head>')
-    style_before_head_close = style_pos < head_close_pos
+# 5. Перевірка посилання на CSS мнемотехніки в head
+style_before_head_close = 0 < css_link_pos < html.find('</head>')
 checks.append(('CSS в head секції', style_before_head_close))
 
 # Виводимо результати
@@ -3,10 +3,25 @@
 Валідація всіх згенерованих файлів на наявність мнемотехніки
 """
 from pathlib import Path
+import re
 
 output_dir = Path(__file__).parent.parent / "output"
 journeys_dir = output_dir / "journeys"
 
+# Спільні файли мнемотехніки, які підключає кожна сторінка
+MNEMONICS_CSS = r'mnemonics\.[0-9a-f]+\.css'
+JOURNEY_JS = r'journey\.[0-9a-f]+\.js'
+
+
+def linked_asset(html_file, content, pattern):
+    """Позиція посилання на файл pattern у сторінці та його текст (None, '' якщо немає)"""
+    match = re.search(r'(?:href|src)="([^"]*%s)"' % pattern, content)
+    if not match:
+        return None, ''
+    asset = html_file.parent / match.group(1)
+    return match.start(), asset.read_text(encoding='utf-8') if asset.exists() else ''
+
+
 if not journeys_dir.exists():
     print("[ERROR] Папка journeys не існує!")
     exit(1)
@@ -26,16 +41,18 @@ for html_file in html_files:
     
     with open(html_file, 'r', encoding='utf-8') as f:
         content = f.read()
+    _, css = linked_asset(html_file, content, MNEMONICS_CSS)
+    _, js = linked_asset(html_file, content, JOURNEY_JS)
     
     # Детальні перевірки для кожного компонента
     checks = {
         'vocabulary-grid': '<div class="vocabulary-grid">' in content,
-        'articles-quiz': 'articles-quiz' in content,
+        'articles-quiz': 'articles-quiz' in content + css,
         'articles-legend': 'articles-legend' in content,
-        'CSS vars': '--der-primary' in content,
-        'JS init': 'initArticlesQuiz' in content,
-        'vocab-card': 'vocab-card' in content,
-        'quiz-item': 'quiz-item' in content
+        'CSS vars': '--der-primary' in css,
+        'JS init': 'initArticlesQuiz' in js,
+        'vocab-card': 'vocab-card' in content + css,
+        'quiz-item': 'quiz-item' in content + css
     }
     
     detailed_checks[character] = checks
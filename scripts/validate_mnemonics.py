@@ -8,6 +8,20 @@ import re
 output_dir = Path(__file__).parent.parent / "output"
 journeys_dir = output_dir / "journeys"
 
+# Спільні файли мнемотехніки, які підключає кожна сторінка
+MNEMONICS_CSS = r'mnemonics\.[0-9a-f]+\.css'
+JOURNEY_JS = r'journey\.[0-9a-f]+\.js'
+
+
+def linked_asset(html_file, content, pattern):
+    """Позиція посилання на файл pattern у сторінці та його текст (None, '' якщо немає)"""
+    match = re.search(r'(?:href|src)="([^"]*%s)"' % pattern, content)
+    if not match:
+        return None, ''
+    asset = html_file.parent / match.group(1)
+    return match.start(), asset.read_text(encoding='utf-8') if asset.exists() else ''
+
+
 validation_results = []
 
 print("=" * 60)
@@ -17,15 +31,17 @@ print("=" * 60)
 for html_file in journeys_dir.glob("*.html"):
     with open(html_file, 'r', encoding='utf-8') as f:
         content = f.read()
+    _, css = linked_asset(html_file, content, MNEMONICS_CSS)
+    _, js = linked_asset(html_file, content, JOURNEY_JS)
     
     # Перевірки
     has_vocab = 'vocabulary-section' in content
-    has_quiz = 'articles-quiz' in content
+    has_quiz = 'articles-quiz' in content + css
     has_legend = 'articles-legend' in content
-    vocab_cards = content.count('vocab-card')
-    quiz_items = content.count('quiz-item')
-    has_css_vars = '--der-primary' in content
-    has_js = 'initArticlesQuiz' in content
+    vocab_cards = (content + css + js).count('vocab-card')
+    quiz_items = (content + css + js).count('quiz-item')
+    has_css_vars = '--der-primary' in css
+    has_js = 'initArticlesQuiz' in js
     
     validation_results.append({
         'file': html_file.name,
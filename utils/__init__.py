@@ -1,17 +1,60 @@
-"""Utility helpers for the King Lear Comic generator."""
+"""Utility helpers for the King Lear Comic generator.
 
-from .console_output import console_line, info, warning, error, success
-from .file_operations import (
-    read_text,
-    write_text,
-    read_json,
-    write_json,
-    ensure_directory,
+Helpers are imported from their submodule on first access, so importing
+one of them does not load the others.
+"""
+from typing import TYPE_CHECKING
+
+from .lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .artifact_cache import ArtifactCache
+    from .console_output import console_line, info, warning, error, success
+    from .file_operations import (
+        read_text,
+        write_text,
+        write_if_changed,
+        read_json,
+        write_json,
+        ensure_directory,
+        file_digest,
+        files_digest,
+        fingerprinted_name,
+    )
+    from .html_rewriter import HTMLRewriter
+    from .memory import peak_rss
+    from .pipeline import Pipeline, Stage
+    from .text_processing import collapse_whitespace, compact_html, slugify, split_sentences
+    from .timing import StageTimer
+    from .validation import ensure_file_length, ensure_directory_structure
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        ".artifact_cache": ("ArtifactCache",),
+        ".console_output": ("console_line", "info", "warning", "error", "success"),
+        ".file_operations": (
+            "read_text",
+            "write_text",
+            "write_if_changed",
+            "read_json",
+            "write_json",
+            "ensure_directory",
+            "file_digest",
+            "files_digest",
+            "fingerprinted_name",
+        ),
+        ".html_rewriter": ("HTMLRewriter",),
+        ".memory": ("peak_rss",),
+        ".pipeline": ("Pipeline", "Stage"),
+        ".text_processing": ("collapse_whitespace", "compact_html", "slugify", "split_sentences"),
+        ".timing": ("StageTimer",),
+        ".validation": ("ensure_file_length", "ensure_directory_structure"),
+    },
 )
-from .text_processing import collapse_whitespace, slugify, split_sentences
-from .validation import ensure_file_length, ensure_directory_structure
 
 __all__ = [
+    "ArtifactCache",
     "console_line",
     "info",
     "warning",
@@ -19,12 +62,22 @@ __all__ = [
     "success",
     "read_text",
     "write_text",
+    "write_if_changed",
     "read_json",
     "write_json",
     "ensure_directory",
+    "file_digest",
+    "files_digest",
+    "fingerprinted_name",
+    "HTMLRewriter",
+    "peak_rss",
+    "Pipeline",
+    "Stage",
     "collapse_whitespace",
+    "compact_html",
     "slugify",
     "split_sentences",
+    "StageTimer",
     "ensure_file_length",
     "ensure_directory_structure",
 ]
@@ -1,12 +1,22 @@
 """File operation helpers without external dependencies."""
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import zlib
+from itertools import count
 from pathlib import Path
-from typing import Any, Union
+from typing import Any, Iterable, Optional, Tuple, Union
 
 PathLike = Union[str, Path]
 
+# Write buffer of streamed files; peak memory per file is about this much
+STREAM_BUFFER_SIZE = 1 << 16
+
+# Makes temp file names unique within a process (see _temp_path)
+_temp_ids = count()
+
 
 def ensure_directory(path: PathLike) -> Path:
     """Ensure that a directory exists and return it as Path."""
@@ -21,15 +31,125 @@ def read_text(path: PathLike, encoding: str = "utf-8") -> str:
         return handle.read()
 
 
-def write_text(path: PathLike, content: str, encoding: str = "utf-8") -> Path:
-    """Write text content to a file and return the Path."""
-    file_path = Path(path)
+def _replace_with(file_path: Path, data: bytes) -> Path:
+    """Write through a temp file and rename it over ``file_path``.
+
+    Readers never see a half-written file, and an existing file that is a
+    hardlink (e.g. in a staged output tree) is replaced, not modified.
+    """
     file_path.parent.mkdir(parents=True, exist_ok=True)
-    with file_path.open("w", encoding=encoding) as handle:
-        handle.write(content)
+    tmp_path = _temp_path(file_path)
+    try:
+        with tmp_path.open("wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, file_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
     return file_path
 
 
+def _holds(file_path: Path, data: bytes) -> bool:
+    try:
+        if file_path.stat().st_size != len(data):
+            return False
+    except OSError:
+        return False
+    return file_digest(file_path) == hashlib.sha256(data).hexdigest()
+
+
+def _temp_path(file_path: Path) -> Path:
+    """Temp name next to ``file_path``, unique per process and call.
+
+    Builds running side by side (``--shard``) write the same cache files;
+    a shared temp name would let one rename the other's half-written file.
+    """
+    return file_path.with_name(f".{file_path.name}.{os.getpid()}.{next(_temp_ids)}.tmp")
+
+
+def _commit(tmp_path: Path, file_path: Path, digest: str, size: int) -> bool:
+    """Rename ``tmp_path`` over ``file_path`` unless that already holds the same bytes."""
+    try:
+        same = file_path.stat().st_size == size and file_digest(file_path) == digest
+    except OSError:
+        same = False
+    if same:
+        tmp_path.unlink()
+        return False
+    os.replace(tmp_path, file_path)
+    return True
+
+
+def write_if_changed(path: PathLike, content: Union[str, bytes], encoding: str = "utf-8") -> bool:
+    """Write content unless the file already holds the same bytes.
+
+    Returns True when the file was written. An unchanged file is not
+    touched, so its mtime (and any hardlink to it) is preserved.
+    """
+    file_path = Path(path)
+    data = content.encode(encoding) if isinstance(content, str) else content
+    if _holds(file_path, data):
+        return False
+    _replace_with(file_path, data)
+    return True
+
+
+def write_stream_if_changed(
+    path: PathLike,
+    chunks: Iterable[Union[str, bytes]],
+    encoding: str = "utf-8",
+    gzip_path: Optional[PathLike] = None,
+) -> Tuple[bool, int]:
+    """Stream chunks into ``path`` through a temp file, like ``write_if_changed``.
+
+    Only one chunk and the write buffer are in memory at a time; the digest
+    is taken on the way, and the temp file replaces ``path`` only when it
+    differs. With ``gzip_path`` a gzip copy (the bytes of
+    ``gzip.compress(data, 9, mtime=0)``) is written in the same pass.
+    Returns whether any file changed and the size of ``path`` in bytes.
+    """
+    file_path = Path(path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = _temp_path(file_path)
+    gz_path = Path(gzip_path) if gzip_path is not None else None
+    gz_tmp = _temp_path(gz_path) if gz_path is not None else None
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with tmp_path.open("wb", buffering=STREAM_BUFFER_SIZE) as handle:
+            gz_handle = gz_tmp.open("wb", buffering=STREAM_BUFFER_SIZE) if gz_tmp else None
+            try:
+                # wbits=31: gzip container with a zero mtime, as gzip.compress(mtime=0)
+                deflate = zlib.compressobj(9, zlib.DEFLATED, 31) if gz_handle else None
+                for chunk in chunks:
+                    data = chunk.encode(encoding) if isinstance(chunk, str) else chunk
+                    handle.write(data)
+                    digest.update(data)
+                    size += len(data)
+                    if deflate is not None:
+                        gz_handle.write(deflate.compress(data))
+                if deflate is not None:
+                    gz_handle.write(deflate.flush())
+            finally:
+                if gz_handle is not None:
+                    gz_handle.close()
+        changed = _commit(tmp_path, file_path, digest.hexdigest(), size)
+        if gz_path is not None:
+            gz_changed = _commit(gz_tmp, gz_path, file_digest(gz_tmp), gz_tmp.stat().st_size)
+            changed = gz_changed or changed
+    finally:
+        for leftover in (tmp_path, gz_tmp):
+            if leftover is not None and leftover.exists():
+                leftover.unlink()
+    return changed, size
+
+
+def write_text(path: PathLike, content: str, encoding: str = "utf-8") -> Path:
+    """Write text content to a file (skipped when unchanged) and return the Path."""
+    write_if_changed(path, content, encoding)
+    return Path(path)
+
+
 def read_json(path: PathLike, encoding: str = "utf-8") -> Any:
     """Load JSON content from disk."""
     with Path(path).open("r", encoding=encoding) as handle:
@@ -37,9 +157,38 @@ def read_json(path: PathLike, encoding: str = "utf-8") -> Any:
 
 
 def write_json(path: PathLike, data: Any, encoding: str = "utf-8", *, indent: int = 2) -> Path:
-    """Dump JSON data to disk."""
-    file_path = Path(path)
-    file_path.parent.mkdir(parents=True, exist_ok=True)
-    with file_path.open("w", encoding=encoding) as handle:
-        json.dump(data, handle, ensure_ascii=False, indent=indent)
-    return file_path
+    """Dump JSON data to disk (skipped when unchanged)."""
+    # One dumps() + write() is much faster than json.dump's chunked writes.
+    write_if_changed(path, json.dumps(data, ensure_ascii=False, indent=indent), encoding)
+    return Path(path)
+
+
+def file_digest(path: PathLike) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprinted_name(name: str, content: Union[str, bytes], length: int = 10) -> str:
+    """``mnemonics.css`` -> ``mnemonics.<content hash>.css`` for immutable caching."""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    stem, dot, suffix = name.rpartition(".")
+    if not dot:
+        stem, suffix = name, ""
+    tag = hashlib.sha256(data).hexdigest()[:length]
+    return f"{stem}.{tag}.{suffix}" if suffix else f"{stem}.{tag}"
+
+
+def files_digest(paths: Iterable[PathLike], root: PathLike) -> str:
+    """Return one digest covering the names (relative to root) and contents of files."""
+    base = Path(root)
+    digest = hashlib.sha256()
+    for path in sorted(Path(item) for item in paths):
+        digest.update(path.relative_to(base).as_posix().encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(file_digest(path).encode("ascii"))
+        digest.update(b"\n")
+    return digest.hexdigest()
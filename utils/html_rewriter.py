@@ -0,0 +1,329 @@
+"""Single-pass streaming HTML rewriter built on ``html.parser``."""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Elements without an end tag; they never open a scope.
+VOID_ELEMENTS = frozenset(
+    {
+        "area", "base", "br", "col", "embed", "hr", "img", "input",
+        "link", "meta", "param", "source", "track", "wbr",
+    }
+)
+
+_SELECTOR_RE = re.compile(r"^([a-zA-Z][\w-]*)?((?:[.#][\w-]+)*)$")
+
+
+class Selector:
+    """A simple CSS selector: ``tag``, ``.class``, ``#id`` or a combination.
+
+    ``div.vocabulary-section`` matches a ``div`` carrying that class; a
+    compound like ``section.card#first`` needs every part to match.
+    """
+
+    def __init__(self, text: str) -> None:
+        match = _SELECTOR_RE.match(text.strip())
+        if not match or not text.strip():
+            raise ValueError(f"unsupported selector {text!r}; use tag, .class, #id or tag.class")
+        self.text = text.strip()
+        self.tag = (match.group(1) or "").lower() or None
+        parts = re.findall(r"([.#])([\w-]+)", match.group(2))
+        self.classes = frozenset(name for kind, name in parts if kind == ".")
+        self.ids = frozenset(name for kind, name in parts if kind == "#")
+
+    def matches(self, tag: str, attrs: Dict[str, Optional[str]]) -> bool:
+        if self.tag and self.tag != tag:
+            return False
+        if self.classes and not self.classes <= set((attrs.get("class") or "").split()):
+            return False
+        return all(attrs.get("id") == element_id for element_id in self.ids)
+
+    def __repr__(self) -> str:
+        return f"Selector({self.text!r})"
+
+
+@dataclass
+class _Rule:
+    selector: Selector
+    action: str  # "append", "insert_after" or "remove_if_empty"
+    html: str = ""
+    # Only the first matching element is edited
+    once: bool = False
+
+
+@dataclass
+class _Element:
+    tag: str
+    rules: List[_Rule]
+    capture: Optional["_Capture"] = None
+
+
+@dataclass
+class _Capture:
+    """Output of an element that is dropped if it turns out empty."""
+
+    parts: List[str] = field(default_factory=list)
+    empty: bool = True
+
+
+class HTMLRewriter:
+    """Apply selector-keyed edits to a page in one pass over its chunks.
+
+    Edits are registered up front and run while the document streams
+    through ``rewrite``; everything they do not touch is passed on byte
+    for byte, so a page without matches comes out unchanged::
+
+        rewriter = HTMLRewriter().append_to_head("<style>...</style>\\n")
+        html = "".join(rewriter.rewrite([html]))
+
+    Only an element being checked by ``remove_if_empty`` is held back;
+    all other text is yielded as soon as the chunk it arrived in is parsed.
+    Rules registered with ``once`` apply to the first match only; when all
+    rules are spent the rest of the document is copied without parsing.
+    """
+
+    def __init__(self) -> None:
+        self.rules: List[_Rule] = []
+
+    def insert_after(self, selector: str, html: str, once: bool = False) -> "HTMLRewriter":
+        """Insert ``html`` right after the end tag of each matching element."""
+        self.rules.append(_Rule(Selector(selector), "insert_after", html, once))
+        return self
+
+    def append(self, selector: str, html: str, once: bool = False) -> "HTMLRewriter":
+        """Insert ``html`` as the last content of each matching element."""
+        self.rules.append(_Rule(Selector(selector), "append", html, once))
+        return self
+
+    def append_to_head(self, html: str) -> "HTMLRewriter":
+        """Insert ``html`` just before ``</head>``."""
+        return self.append("head", html, once=True)
+
+    def remove_if_empty(self, selector: str, once: bool = False) -> "HTMLRewriter":
+        """Drop matching elements that hold nothing but whitespace and comments."""
+        self.rules.append(_Rule(Selector(selector), "remove_if_empty", once=once))
+        return self
+
+    def rewrite(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Yield the rewritten document as the chunks are parsed."""
+        if not self.rules:
+            yield from chunks
+            return
+        parser = _RewriteParser(self.rules)
+        for chunk in chunks:
+            if parser.spent:
+                yield chunk
+                continue
+            parser.feed(chunk)
+            yield from parser.drain()
+        parser.close()
+        yield from parser.drain()
+
+    def rewrite_text(self, html: str) -> str:
+        """Rewrite a whole document held in memory."""
+        return "".join(self.rewrite([html]))
+
+
+class _Spent(Exception):
+    """Raised inside the parser to stop it once every rule is applied."""
+
+
+class _RewriteParser(HTMLParser):
+    """Cut the fed text into per-event raw spans and apply the rules at the seams.
+
+    ``html.parser`` only reports where an event starts (``getpos()``); the
+    raw text of an event therefore runs up to the start of the next one and
+    is written when that one arrives. Actions that belong after an event
+    (end-of-element edits) wait in ``_after`` until its raw text is out.
+    Unmatched markup is never sliced out; it is written with the next seam.
+    """
+
+    def __init__(self, rules: List[_Rule]) -> None:
+        super().__init__(convert_charrefs=True)
+        # Rules that can still match; a ``once`` rule leaves on its first match
+        self.rules = list(rules)
+        # All rules applied: the remaining text is copied as is
+        self.spent = False
+        self._out: List[str] = []
+        # Fed text not yet written; _start is where the current event begins
+        self._pending = ""
+        self._start = 0
+        self._line, self._col = 1, 0
+        self._after: List[Tuple[str, object]] = []
+        self._stack: List[_Element] = []
+        self._captures: List[_Capture] = []
+
+    # -- plumbing -----------------------------------------------------
+
+    def feed(self, data: str) -> None:
+        if self._start:
+            self._pending = self._pending[self._start :]
+            self._start = 0
+        self._pending += data
+        try:
+            super().feed(data)
+        except _Spent:
+            self._write(self._pending[self._start :])
+            self._pending, self._start = "", 0
+
+    def close(self) -> None:
+        if not self.spent:
+            try:
+                super().close()
+            except _Spent:
+                pass
+        # The last event (and anything the parser held back) runs to the end
+        self._write(self._pending[self._start :])
+        self._pending, self._start = "", 0
+        self._run_after()
+        # Elements left open end with the document
+        while self._stack:
+            self._close_element(self._stack.pop())
+            self._run_after()
+
+    def drain(self) -> List[str]:
+        out, self._out = self._out, []
+        return out
+
+    def _offset(self, line: int, col: int) -> int:
+        """Index in ``_pending`` of the parser position ``(line, col)``."""
+        if line == self._line:
+            return self._start + col - self._col
+        index = self._start - 1
+        for _ in range(line - self._line):
+            index = self._pending.index("\n", index + 1)
+        return index + 1 + col
+
+    def _sync(self) -> None:
+        """Write the raw text of the previous event and run its trailing actions."""
+        line, col = self.getpos()
+        end = self._offset(line, col)
+        self._write(self._pending[self._start : end])
+        self._start, self._line, self._col = end, line, col
+        self._run_after()
+        self._check_spent()
+
+    def _check_spent(self) -> None:
+        """Stop parsing once no rule is left and no edit is in progress."""
+        if self.rules or self._after or self._captures:
+            return
+        if any(element.rules for element in self._stack):
+            return
+        self.spent = True
+        raise _Spent
+
+    def _write(self, text: str) -> None:
+        if not text:
+            return
+        if self._captures:
+            self._captures[-1].parts.append(text)
+        else:
+            self._out.append(text)
+
+    def _run_after(self) -> None:
+        after, self._after = self._after, []
+        for action, value in after:
+            if action == "release":
+                capture = self._captures.pop()
+                if not capture.empty:
+                    self._write("".join(capture.parts))
+            else:
+                self._write(value)
+
+    def _mark_content(self) -> None:
+        for capture in self._captures:
+            capture.empty = False
+
+    # -- elements -----------------------------------------------------
+
+    def _open_element(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> _Element:
+        values = dict(attrs)
+        element = _Element(tag, [rule for rule in self.rules if rule.selector.matches(tag, values)])
+        if element.rules or self._after:
+            self._sync()
+        if any(rule.once for rule in element.rules):
+            self.rules = [rule for rule in self.rules if not (rule.once and rule in element.rules)]
+        self._mark_content()
+        if any(rule.action == "remove_if_empty" for rule in element.rules):
+            # The start tag is written on the next seam, straight into the capture
+            element.capture = _Capture()
+            self._captures.append(element.capture)
+        return element
+
+    def _close_element(self, element: _Element) -> None:
+        """Write the appends of ``element`` and queue the edits due after its end tag."""
+        for rule in element.rules:
+            if rule.action == "append":
+                self._write(rule.html)
+        if element.capture is not None:
+            self._after.append(("release", element.capture))
+        for rule in element.rules:
+            if rule.action == "insert_after":
+                self._after.append(("write", rule.html))
+
+    def _event(self) -> None:
+        """An event no rule acts on; it only ends the span of a pending action."""
+        if self._after:
+            self._sync()
+
+    # -- HTMLParser events ----------------------------------------------
+    # Seams are only cut where an edit lands; the text of every other
+    # event stays in the span of the one before it.
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        element = self._open_element(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self._close_element(element)
+            self._check_spent()
+        else:
+            self._stack.append(element)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._close_element(self._open_element(tag, attrs))
+        self._check_spent()
+
+    def handle_endtag(self, tag: str) -> None:
+        for depth in range(len(self._stack) - 1, -1, -1):
+            if self._stack[depth].tag == tag:
+                break
+        else:
+            self._event()  # stray end tag
+            return
+        closing = self._stack[depth:]
+        if self._after or any(element.rules for element in closing):
+            self._sync()
+        del self._stack[depth:]
+        # Elements left open inside end here, before this end tag is written
+        for element in reversed(closing[1:]):
+            self._close_element(element)
+            self._run_after()
+        self._close_element(closing[0])
+        self._check_spent()
+
+    def handle_data(self, data: str) -> None:
+        self._event()
+        if data.strip():
+            self._mark_content()
+
+    def handle_entityref(self, name: str) -> None:
+        self._event()
+        self._mark_content()
+
+    def handle_charref(self, name: str) -> None:
+        self._event()
+        self._mark_content()
+
+    def handle_comment(self, data: str) -> None:
+        self._event()
+
+    def handle_decl(self, decl: str) -> None:
+        self._event()
+
+    def handle_pi(self, data: str) -> None:
+        self._event()
+
+    def unknown_decl(self, data: str) -> None:
+        self._event()
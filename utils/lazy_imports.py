@@ -0,0 +1,31 @@
+"""Attribute-based lazy imports for package ``__init__`` modules (PEP 562)."""
+from __future__ import annotations
+
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+def lazy_exports(
+    package: str, submodules: Dict[str, Sequence[str]]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Module ``__getattr__``/``__dir__`` importing ``submodules`` on first use.
+
+    ``submodules`` maps a relative module name to the names it exports, e.g.
+    ``{".html_lira": ("LiraHTMLGenerator",)}``. A resolved name is stored in
+    the package namespace, so later lookups never reach ``__getattr__``.
+    """
+    owners = {name: module for module, names in submodules.items() for name in names}
+
+    def __getattr__(name: str) -> Any:
+        module = owners.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(owners))
+
+    return __getattr__, __dir__
@@ -0,0 +1,24 @@
+"""Peak resident memory of the build process and its workers."""
+from __future__ import annotations
+
+import sys
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module
+    resource = None
+
+
+def peak_rss(children: bool = False) -> Optional[int]:
+    """High-water mark of the resident set size in bytes (None if unknown).
+
+    With ``children`` the value covers the largest terminated child process,
+    i.e. the busiest pool worker of a parallel build.
+    """
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
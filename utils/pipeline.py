@@ -0,0 +1,136 @@
+"""Ordered build stages with input-keyed caching and per-stage timing."""
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, is_dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from .artifact_cache import ArtifactCache
+from .timing import StageTimer
+
+State = Dict[str, Any]
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, Path):
+        return value.as_posix()
+    if is_dataclass(value):
+        return vars(value)
+    raise TypeError(f"cannot key a pipeline input of type {type(value).__name__}")
+
+
+def value_digest(value: Any) -> str:
+    """SHA-256 of a JSON-like value (sets, paths and dataclasses allowed)."""
+    payload = json.dumps(value, ensure_ascii=False, default=_jsonable)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Stage:
+    """One named step of a pipeline.
+
+    ``func`` gets the declared ``inputs`` as keyword arguments and returns a
+    dict merged into the pipeline state. A ``cached`` stage is keyed on its
+    name, ``version`` and the digests of its inputs; ``dump``/``restore``
+    convert its outputs to and from JSON for the artifact cache. ``when``
+    decides per run whether the stage applies at all.
+    """
+
+    name: str
+    func: Callable[..., State]
+    inputs: Sequence[str] = ()
+    cached: bool = False
+    version: str = ""
+    when: Optional[Callable[[State], bool]] = None
+    dump: Optional[Callable[[State], Any]] = None
+    restore: Optional[Callable[[Any], State]] = None
+
+
+class Pipeline:
+    """Run stages in order over a shared state dict.
+
+    Every stage is timed under its own name (cache lookups under "cache").
+    Input digests are computed once per run; outputs of a cached stage are
+    identified by the stage key, so downstream keys never rehash them.
+    """
+
+    def __init__(
+        self,
+        stages: Iterable[Stage] = (),
+        timer: Optional[StageTimer] = None,
+        cache: Optional[ArtifactCache] = None,
+    ) -> None:
+        self.stages: List[Stage] = list(stages)
+        self.timer = timer or StageTimer()
+        self.cache = cache
+        # Cache key of every cached stage in the most recent run.
+        self.keys: Dict[str, str] = {}
+
+    @property
+    def names(self) -> List[str]:
+        return [stage.name for stage in self.stages]
+
+    def get(self, name: str) -> Stage:
+        return self.stages[self.names.index(name)]
+
+    def add(self, stage: Stage, before: Optional[str] = None, after: Optional[str] = None) -> None:
+        """Insert a stage before/after a named one (default: at the end)."""
+        if before is not None:
+            self.stages.insert(self.names.index(before), stage)
+        elif after is not None:
+            self.stages.insert(self.names.index(after) + 1, stage)
+        else:
+            self.stages.append(stage)
+
+    def replace(self, stage: Stage) -> None:
+        self.stages[self.names.index(stage.name)] = stage
+
+    def remove(self, name: str) -> None:
+        del self.stages[self.names.index(name)]
+
+    def run(self, state: State) -> State:
+        state = dict(state)
+        digests: Dict[str, str] = {}
+        self.keys = {}
+        for stage in self.stages:
+            if stage.when is not None and not stage.when(state):
+                continue
+            key = None
+            if stage.cached and self.cache is not None:
+                with self.timer.stage("cache"):
+                    key = self._key(stage, state, digests)
+                    hit = self.cache.get(key)
+                if hit is not None:
+                    self.keys[stage.name] = key
+                    self._merge(state, stage.restore(hit) if stage.restore else hit, digests, key)
+                    continue
+            with self.timer.stage(stage.name):
+                outputs = stage.func(**{name: state[name] for name in stage.inputs})
+            if key is not None:
+                with self.timer.stage("cache"):
+                    self.cache.put(key, stage.dump(outputs) if stage.dump else outputs)
+                self.keys[stage.name] = key
+            self._merge(state, outputs, digests, key)
+        return state
+
+    @staticmethod
+    def _key(stage: Stage, state: State, digests: Dict[str, str]) -> str:
+        parts = [stage.name, stage.version]
+        for name in stage.inputs:
+            if name not in digests:
+                digests[name] = value_digest(state[name])
+            parts.append(f"{name}={digests[name]}")
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _merge(state: State, outputs: State, digests: Dict[str, str], key: Optional[str]) -> None:
+        for name, value in outputs.items():
+            state[name] = value
+            if key is None:
+                digests.pop(name, None)
+            else:
+                digests[name] = hashlib.sha256(f"{key}:{name}".encode("utf-8")).hexdigest()
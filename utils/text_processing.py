@@ -7,6 +7,9 @@ from typing import Iterable, List
 _WHITESPACE_RE = re.compile(r"\s+")
 _NON_WORD_RE = re.compile(r"[^a-z0-9]+")
 _SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_RAW_BLOCK_RE = re.compile(r"(<(script|pre|textarea)\b.*?</\2\s*>)", re.IGNORECASE | re.DOTALL)
+_TRAILING_SPACE_RE = re.compile(r"[ \t]+\n")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n")
 
 
 def collapse_whitespace(value: str) -> str:
@@ -30,3 +33,12 @@ def split_sentences(text: str) -> List[str]:
     parts: Iterable[str] = _SENTENCE_END_RE.split(text)
     sentences = [segment.strip() for segment in parts if segment.strip()]
     return sentences
+
+
+def compact_html(html: str) -> str:
+    """Drop trailing spaces and blank lines outside script/pre/textarea blocks."""
+    parts = _RAW_BLOCK_RE.split(html)
+    # split() yields text, block, tag name, text, block, tag name, ...
+    for index in range(0, len(parts), 3):
+        parts[index] = _BLANK_LINES_RE.sub("\n", _TRAILING_SPACE_RE.sub("\n", parts[index]))
+    return "".join(part for index, part in enumerate(parts) if index % 3 != 2)
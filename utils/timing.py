@@ -0,0 +1,55 @@
+"""Lightweight wall-clock timing of named stages."""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+class StageTimer:
+    """Accumulate elapsed seconds per stage name.
+
+    Stages may nest: time spent in an inner stage is counted for the inner
+    one only, so the totals add up to the wall-clock time.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        # Seconds spent in inner stages, per open stage
+        self._inner: List[float] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and add it to ``name``."""
+        started = time.perf_counter()
+        self._inner.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            inner = self._inner.pop()
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed - inner
+            if self._inner:
+                self._inner[-1] += elapsed
+
+    def iterate(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Yield from ``items``, timing the production of each item under ``name``.
+
+        Used for lazy stages: a stream is produced while a later stage
+        consumes it, and each stage keeps its own share of the time.
+        """
+        iterator = iter(items)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def reset(self) -> Dict[str, float]:
+        """Return the collected timings and start over."""
+        stages, self.stages = self.stages, {}
+        return stages